@@ -33,6 +33,13 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8001
     HTTP_TIMEOUT : int = 30
+    # Open /tasks/stream subscriptions; they use their own connections so
+    # idle subscribers never hold up short requests
+    EVENT_STREAM_MAX_CONNECTIONS: int = 10000
+
+    # Shared with internal services: when set, forwarded identities are signed
+    # (identity.py) and task-service trusts the signature instead of the JWT
+    INTERNAL_AUTH_SECRET: str = ""
 
     class Config:
         env_file = "../.env"
@@ -1,12 +1,21 @@
 from fastapi import Request, HTTPException, status
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from jose import jwt, JWTError
 from config import get_settings
-from services import get_http_client
+from identity import ASSERTION_HEADER, sign_identity
+from services import EVENT_STREAM_TIMEOUT, get_http_client
+import httpx
 
 settings = get_settings()
 http_client = get_http_client()
 
+# Backend responses relayed chunk by chunk instead of being buffered in memory
+STREAMING_CONTENT_TYPES = {"application/x-ndjson", "text/csv", "text/event-stream"}
+
+# Identity headers only the gateway may set; client copies are dropped
+IDENTITY_HEADERS = {"x-user-id", "x-user-email", ASSERTION_HEADER.lower()}
+
 async def proxy_request(request: Request, path: str):
 
     public_endpoints = ["auth/login", "auth/register", "auth/refresh-token"]
@@ -40,7 +49,8 @@ async def validate_jwt(req: Request) -> tuple[str, str]:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         user_id = payload.get("sub")
         user_email = payload.get("email")
-        if not user_id:
+        # Refresh tokens only work at the public auth/refresh-token route
+        if not user_id or payload.get("type", "access") != "access":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
@@ -64,10 +74,12 @@ def get_backend_url(path: str) -> str:
         )
 async def forward_request(request: Request, backend_url: str, path: str, user_id: str, user_email: str) -> Response:
     method = request.method
-    headers = dict(request.headers)
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in IDENTITY_HEADERS}
     if user_id:
         headers["X-User-ID"] = user_id
-        headers["X-User-Email"] = user_email
+        headers["X-User-Email"] = user_email or ""
+        if settings.INTERNAL_AUTH_SECRET:
+            headers[ASSERTION_HEADER] = sign_identity(settings.INTERNAL_AUTH_SECRET, user_id, user_email or "")
     headers.pop("Authorization", None)
     headers.pop("Host", None)
     
@@ -75,13 +87,24 @@ async def forward_request(request: Request, backend_url: str, path: str, user_id
     body = await request.body()
     url = f"{backend_url}/{path}"
 
-    backend_response = await http_client.client.request(
+    # Event streams get their own client: each holds a connection until the subscriber leaves
+    event_stream = accepts_event_stream(request)
+    client = http_client.stream_client if event_stream else http_client.client
+
+    backend_request = client.build_request(
             method=method,
             url=url,
             headers=headers,
             content=body,
             params=request.query_params,
-            # timeout=settings.HTTP_TIMEOUT
+            timeout=EVENT_STREAM_TIMEOUT if event_stream else httpx.USE_CLIENT_DEFAULT
+        )
+    try:
+        backend_response = await client.send(backend_request, stream=True)
+    except (httpx.PoolTimeout, httpx.ConnectError, httpx.ConnectTimeout):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service unavailable"
         )
 
     # Strip hop-by-hop headers
@@ -95,8 +118,28 @@ async def forward_request(request: Request, backend_url: str, path: str, user_id
         if k.lower() not in unsafe_headers
     }
 
+    if is_streaming_response(backend_response):
+        return StreamingResponse(
+            backend_response.aiter_raw(),
+            status_code=backend_response.status_code,
+            headers=safe_headers,
+            background=BackgroundTask(backend_response.aclose)
+        )
+
+    try:
+        content = await backend_response.aread()
+    finally:
+        await backend_response.aclose()
+
     return Response(
-        content=backend_response.content,
+        content=content,
         status_code=backend_response.status_code,
         headers=safe_headers
     )
+
+def accepts_event_stream(request: Request) -> bool:
+    return "text/event-stream" in request.headers.get("accept", "")
+
+def is_streaming_response(response) -> bool:
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in STREAMING_CONTENT_TYPES
@@ -81,10 +81,15 @@ class RedisService:
             logger.error(f"Rate limit increment failed: {e}")
             return 0
         
+#Event streams stay open and idle between events: no read timeout
+EVENT_STREAM_TIMEOUT = httpx.Timeout(settings.HTTP_TIMEOUT, read=None)
+
 #HTTP Service
 class HTTPClientService:
     def __init__(self):
         self.client: Optional[httpx.AsyncClient] = None
+        #Client for long-lived event streams, so they never drain the pool above
+        self.stream_client: Optional[httpx.AsyncClient] = None
     async def connect(self) -> None:
         self.client = httpx.AsyncClient(
             timeout=httpx.Timeout(settings.HTTP_TIMEOUT),
@@ -94,11 +99,22 @@ class HTTPClientService:
             ),
             follow_redirects=True,
         )
+        self.stream_client = httpx.AsyncClient(
+            timeout=EVENT_STREAM_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.EVENT_STREAM_MAX_CONNECTIONS,
+                #A stream's connection is done when the subscriber leaves
+                max_keepalive_connections=0
+            ),
+            follow_redirects=True,
+        )
         logger.info("HTTP client initialized")
 
     async def disconnect(self) -> None:
         if self.client:
             await self.client.aclose()
+        if self.stream_client:
+            await self.stream_client.aclose()
         logger.info("HTTP client closed")
 
 redis_service = RedisService()
@@ -1,4 +1,11 @@
+import httpx
 import pytest
+from jose import jwt
+from config import get_settings
+from identity import ASSERTION_HEADER, verify_identity
+from services import get_http_client
+
+settings = get_settings()
 
 def test_health_check(client):
     response = client.get("/health")
@@ -51,4 +58,118 @@ def test_rate_limiting(client):
 # def test_unknown_route(client):
 #     """Test unknown routes return 404"""
 #     response = client.get("/nonexistent/route")
-#     assert response.status_code == 404
\ No newline at end of file
+#     assert response.status_code == 404
+
+def test_conditional_get_passthrough(client, monkeypatch):
+    """Test If-None-Match reaches the backend and its 304/ETag come back untouched"""
+    seen = {}
+
+    def backend(request: httpx.Request) -> httpx.Response:
+        seen["if-none-match"] = request.headers.get("if-none-match")
+        return httpx.Response(304, headers={"ETag": '"abc"', "Cache-Control": "private, no-cache"})
+
+    monkeypatch.setattr(get_http_client(), "client", httpx.AsyncClient(transport=httpx.MockTransport(backend)))
+    token = jwt.encode({"sub": "user-1", "email": "user@example.com"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+    response = client.get("/tasks", headers={"Authorization": f"Bearer {token}", "If-None-Match": '"abc"'})
+
+    assert seen["if-none-match"] == '"abc"'
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"abc"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.content == b""
+
+
+def test_streaming_response_passthrough(client, monkeypatch):
+    """Test NDJSON exports are relayed chunk by chunk with their headers"""
+    chunks = [b'{"id": 1}\n', b'{"id": 2}\n']
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    def backend(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": "application/x-ndjson"}, content=stream())
+
+    monkeypatch.setattr(get_http_client(), "client", httpx.AsyncClient(transport=httpx.MockTransport(backend)))
+    token = jwt.encode({"sub": "user-1", "email": "user@example.com"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+    with client.stream("GET", "/tasks/export", headers={"Authorization": f"Bearer {token}"}) as response:
+        received = list(response.iter_bytes())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert b"".join(received) == b"".join(chunks)
+
+
+def test_event_stream_has_no_read_timeout(client, monkeypatch):
+    """Test SSE requests are relayed as a stream and not cut off by the read timeout"""
+    seen = {}
+
+    async def stream():
+        yield b"event: resync\ndata: {}\n\n"
+
+    def backend(request: httpx.Request) -> httpx.Response:
+        seen["timeout"] = request.extensions["timeout"]
+        return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, content=stream())
+
+    monkeypatch.setattr(get_http_client(), "stream_client", httpx.AsyncClient(transport=httpx.MockTransport(backend)))
+    token = jwt.encode({"sub": "user-1", "email": "user@example.com"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}", "Accept": "text/event-stream"}
+
+    with client.stream("GET", "/tasks/stream", headers=headers) as response:
+        body = b"".join(response.iter_bytes())
+
+    assert response.headers["content-type"] == "text/event-stream"
+    assert body == b"event: resync\ndata: {}\n\n"
+    assert seen["timeout"]["read"] is None
+
+
+def test_event_streams_leave_the_shared_pool_alone(client, monkeypatch):
+    """Test SSE subscriptions use the stream client, and a drained pool answers 503"""
+    async def stream():
+        yield b"event: resync\ndata: {}\n\n"
+
+    def stream_backend(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, content=stream())
+
+    def exhausted_pool(request: httpx.Request) -> httpx.Response:
+        raise httpx.PoolTimeout("no connection available", request=request)
+
+    monkeypatch.setattr(get_http_client(), "stream_client", httpx.AsyncClient(transport=httpx.MockTransport(stream_backend)))
+    monkeypatch.setattr(get_http_client(), "client", httpx.AsyncClient(transport=httpx.MockTransport(exhausted_pool)))
+    token = jwt.encode({"sub": "user-1", "email": "user@example.com"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with client.stream("GET", "/tasks/stream", headers={**headers, "Accept": "text/event-stream"}) as response:
+        assert response.status_code == 200
+
+    assert client.get("/tasks", headers=headers).status_code == 503
+
+
+def test_identity_headers_are_signed_and_not_spoofable(client, monkeypatch):
+    """Test client identity headers are dropped and, with INTERNAL_AUTH_SECRET, the gateway's are signed"""
+    seen = {}
+
+    def backend(request: httpx.Request) -> httpx.Response:
+        seen.update(request.headers)
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(get_http_client(), "client", httpx.AsyncClient(transport=httpx.MockTransport(backend)))
+    monkeypatch.setattr(settings, "INTERNAL_AUTH_SECRET", "internal-secret")
+    token = jwt.encode({"sub": "user-1", "email": "user@example.com"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "X-User-Email": "admin@example.com",
+        ASSERTION_HEADER: "0.forged",
+    }
+
+    response = client.get("/tasks", headers=headers)
+
+    assert response.status_code == 200
+    assert seen["x-user-id"] == "user-1"
+    assert seen["x-user-email"] == "user@example.com"
+    assert verify_identity("internal-secret", "user-1", "user@example.com", seen[ASSERTION_HEADER.lower()], max_age=30)
+
+    refresh = jwt.encode({"sub": "user-1", "type": "refresh"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    assert client.get("/tasks", headers={"Authorization": f"Bearer {refresh}"}).status_code == 401
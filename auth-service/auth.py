@@ -6,8 +6,9 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 from models import User
-from database import get_db
+from database import get_db, get_read_db
 from config import get_settings
+from token_cache import TokenCache
 import uuid
 import hashlib
 
@@ -17,6 +18,8 @@ settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 #Used to extract bearer token from requests
 security = HTTPBearer()
+#Verified token -> (user id, token type)
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
 
 #Password utilities
 
@@ -78,6 +81,11 @@ def create_refresh_token(user_id: uuid.UUID, email: str) -> tuple[str, datetime]
 def verify_token(token: str, expected_type: str = "access") -> Optional[uuid.UUID]:
     """Verify and return user id if verified or else return None"""
 
+    cached = token_cache.get(token)
+    if cached is not None:
+        user_id, token_type = cached
+        return user_id if token_type == expected_type else None
+
     try:
         payload = jwt.decode(
             token,
@@ -88,22 +96,35 @@ def verify_token(token: str, expected_type: str = "access") -> Optional[uuid.UUI
         user_id= payload.get("sub")
         token_type = payload.get("type")
 
-        if user_id is None or token_type != expected_type:
+        if user_id is None:
             return None
-        
-        return uuid.UUID(user_id)
+
+        verified = uuid.UUID(user_id)
+        token_cache.put(token, (verified, token_type), payload.get("exp"))
+        return verified if token_type == expected_type else None
     except JWTError:
         return None
 
 
-#Dependency for protected routes
+#Dependencies for protected routes
 async def get_current_user(
         credentials: HTTPAuthorizationCredentials = Depends(security),
         db: Session = Depends(get_db)
 ) -> User:
     """Dependency to get current user. If token is not valid or user is not found 401 is raised"""
+    return load_current_user(credentials.credentials, db)
+
+
+async def get_current_user_for_read(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: Session = Depends(get_read_db)
+) -> User:
+    """get_current_user for read-only routes, loaded from the read replica"""
+    return load_current_user(credentials.credentials, db)
+
 
-    token = credentials.credentials
+def load_current_user(token: str, db: Session) -> User:
+    """Load the active user a valid access token belongs to, else raise 401/403"""
 
     user_id = verify_token(token, expected_type="access")
 
@@ -1,7 +1,10 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import get_settings
+from query_stats import instrument
+from read_your_writes import ReadYourWrites, request_user_id
 
 settings = get_settings()
 
@@ -9,31 +12,71 @@ settings = get_settings()
 engine = create_engine(
     settings.get_database_url(),
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
     echo=settings.DEBUG
 )
 
-#Session factory
+#Replica engine for read-only endpoints, the primary itself when no replica is configured
+replica_engine = engine
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.get_replica_database_url(),
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+        max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+        echo=settings.DEBUG
+    )
+
+#Count and time every statement, per request and per process (query_stats.py)
+instrument(engine)
+instrument(replica_engine)
+
+#Session factories
 SessionLocal = sessionmaker(
     autoflush=False,
     autocommit= False,
     bind=engine
 )
 
+ReplicaSessionLocal = sessionmaker(
+    autoflush=False,
+    autocommit=False,
+    bind=replica_engine
+)
+
 
 #Base class for models
 Base = declarative_base()
 
 
+#Users whose reads stay on the primary after a write (read_your_writes.py)
+read_your_writes = ReadYourWrites(window=settings.READ_YOUR_WRITES_SECONDS)
+
+
 def get_db():
-    """Dependency for getting database session"""
+    """
+    Dependency for getting a primary database session
+
+    Endpoints pin the user they wrote for with read_your_writes.pin: register
+    and login requests carry no token to take the user from.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+
+def get_read_db(request: Request):
+    """Dependency for read-only endpoints: a replica session unless the user just wrote"""
+    factory = SessionLocal if read_your_writes.is_pinned(request_user_id(request)) else ReplicaSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def init_db():
     """Create all tables in database"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
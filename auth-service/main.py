@@ -1,8 +1,11 @@
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
-from database import get_db, init_db
+from database import get_db, init_db, read_your_writes
 from contextlib import asynccontextmanager
 from config import get_settings
+from metrics import render_metrics
+from query_stats import QueryStatsMiddleware
 import models
 import schemas
 import auth
@@ -14,7 +17,9 @@ async def lifespan(app:FastAPI):
     """Lifecycle events"""
     #code before yield is for startup and code after yield is for cleanup or shutdown
     init_db()
+    read_your_writes.connect()
     yield
+    read_your_writes.disconnect()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -23,6 +28,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+#Server-Timing with each request's SQL statement count and time
+app.add_middleware(QueryStatsMiddleware)
+
 #Health check endpoint
 @app.get("/health")
 def health_check():
@@ -32,6 +40,11 @@ def health_check():
         "version": settings.VERSION
     }
 
+#Process metrics in Prometheus text format
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return render_metrics()
+
 
 #Authentication endpoints
 
@@ -60,6 +73,8 @@ def register(user_data: schemas.UserCreate, db : Session = Depends(get_db)):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    #Their next reads (login, /auth/me) must see the new row
+    read_your_writes.pin(str(new_user.id))
 
     return new_user
 
@@ -90,14 +105,17 @@ def login(credentials: schemas.LoginRequest, db: Session= Depends(get_db)):
     access_token = auth.create_access_token(user.id, user.email)
     refresh_token, refresh_expires = auth.create_refresh_token(user.id, user.email)
 
+    user_id = user.id
     db_refresh_token = models.RefreshToken(
-        user_id= user.id,
+        user_id= user_id,
         token = refresh_token,
         expires_at = refresh_expires
     )
 
     db.add(db_refresh_token)
     db.commit()
+    #A just-registered user may not have reached the replica yet
+    read_your_writes.pin(str(user_id))
 
     return{
         "access_token": access_token,
@@ -166,7 +184,7 @@ def logout(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
 
 #Get current user
 @app.get("/auth/me", response_model=schemas.UserResponse)
-def get_current_user_profile(current_user: models.User = Depends(auth.get_current_user)):
+def get_current_user_profile(current_user: models.User = Depends(auth.get_current_user_for_read)):
     """Get current authenticated user profile"""
     return current_user
 
@@ -201,6 +219,7 @@ def update_profile(
     # Save changes
     db.commit()
     db.refresh(current_user)
+    read_your_writes.pin(str(current_user.id))
     
     return current_user
     
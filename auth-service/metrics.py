@@ -0,0 +1,37 @@
+"""
+Minimal in-process metrics
+Counters are per worker process and exposed in Prometheus text format on /metrics.
+"""
+
+import threading
+
+_registry: list["Counter"] = []
+
+
+class Counter:
+    """Monotonic counter, safe to increment from any thread"""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+def render_metrics() -> str:
+    """Render every registered counter in Prometheus text exposition format"""
+    lines = []
+    for counter in _registry:
+        lines.append(f"# HELP {counter.name} {counter.description}")
+        lines.append(f"# TYPE {counter.name} counter")
+        lines.append(f"{counter.name} {counter.value:g}")
+    return "\n".join(lines) + "\n"
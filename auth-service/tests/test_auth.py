@@ -1,3 +1,9 @@
+from tests.conftest import TestingSessionLocal, assert_query_budget
+from database import get_read_db, read_your_writes
+from main import app
+import database
+
+
 def test_health_check(client):
     """Test if service is running"""
     response = client.get("/health")
@@ -106,6 +112,26 @@ def test_get_current_user(client):
     assert data["name"] == "Test User"
 
 
+def test_profile_update_visible_on_read(client):
+    """Test /auth/me (served by the read session) returns a just-updated profile"""
+    client.post("/auth/register", json={
+        "email": "test@example.com",
+        "password": "password123",
+        "name": "Test User"
+    })
+    token = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "password123"
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.put("/auth/me", json={"name": "Renamed User"}, headers=headers)
+    response = client.get("/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed User"
+
+
 def test_get_current_user_no_token(client):
     """Test getting profile without token fails"""
     response = client.get("/auth/me")
@@ -167,4 +193,68 @@ def test_logout(client):
         "refresh_token": refresh_token
     })
     
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+
+def test_cached_token_keeps_its_type(client):
+    """Test a cached refresh token is still rejected where an access token is expected"""
+    client.post("/auth/register", json={
+        "email": "test@example.com",
+        "password": "password123",
+        "name": "Test User"
+    })
+    refresh_token = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "password123"
+    }).json()["refresh_token"]
+
+    assert client.post("/auth/refresh", json={"refresh_token": refresh_token}).status_code == 200
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {refresh_token}"})
+    assert response.status_code == 401
+
+
+def test_auth_endpoints_stay_within_query_budget(client):
+    """Test login and profile reads run a fixed number of statements (Server-Timing)"""
+    client.post("/auth/register", json={
+        "email": "test@example.com",
+        "password": "password123",
+        "name": "Test User"
+    })
+    login_response = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "password123"
+    })
+    token = login_response.json()["access_token"]
+    profile = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert_query_budget(login_response, 2)
+    assert_query_budget(profile, 1)
+
+
+def test_new_user_reads_own_writes_from_primary(client, db, monkeypatch):
+    """Test register -> login -> /auth/me sees the new user while the replica lags"""
+    # The test transaction is uncommitted, so a session on another connection
+    # is a replica that hasn't replayed it
+    monkeypatch.setattr(database, "SessionLocal", lambda: db)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", TestingSessionLocal)
+    app.dependency_overrides.pop(get_read_db)
+
+    user_id = client.post("/auth/register", json={
+        "email": "test@example.com",
+        "password": "password123",
+        "name": "Test User"
+    }).json()["id"]
+    token = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "password123"
+    }).json()["access_token"]
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+
+    # Once the pin is gone the read goes to the lagging replica
+    read_your_writes._local.pop(user_id)
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
@@ -0,0 +1,77 @@
+"""
+Cache of verified JWTs
+
+A client sends the same access token with every request until it expires,
+so the result of verifying it (signature, JSON, claims) is kept under the
+token's digest and reused: a hit is one hash and one dict lookup instead
+of a full jwt.decode. Entries never outlive the token's exp, are bounded in
+number (least recently used go first) and never hold the raw token.
+
+Only successful verifications are cached; a bad token is decoded (and
+rejected) every time.
+
+Kept identical in auth-service and task-service.
+"""
+
+from collections import OrderedDict
+from typing import Any, Optional
+import hashlib
+import threading
+import time
+
+
+class TokenCache:
+    """Bounded LRU of token digest -> verified value, each entry valid until its token's exp"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        # Upper bound on an entry's lifetime, whatever the token's exp
+        self.ttl = ttl
+
+        self._entries: OrderedDict[bytes, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[Any]:
+        """The value cached for a token, None if absent or past its expiry"""
+        if self.max_size <= 0:
+            return None
+
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, token: str, value: Any, exp: Optional[float]) -> None:
+        """Cache the value verified from a token until exp (epoch seconds), at most ttl seconds"""
+        if self.max_size <= 0:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl if exp is None else min(exp, now + self.ttl)
+        if expires_at <= now:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -31,6 +31,10 @@ def handle_notification(message_body: str) -> bool:
             handle_task_created(data)
         elif notification_type == "task_updated":
             handle_task_updated(data)
+        elif notification_type == "tasks_imported":
+            handle_tasks_imported(data)
+        elif notification_type in ("task_due_soon", "task_overdue"):
+            handle_task_reminder(data, overdue=notification_type == "task_overdue")
         else:
             logger.warning(f"Unknown notification type: {notification_type}")
             return False  # Unknown type, discard
@@ -87,4 +91,57 @@ def handle_task_updated(data: dict):
     print(f"  Task ID: {task_id}")
     print(f"  Title: {task_title}")
     print(f"  Your task has been updated!")
-    print("="*50 + "\n")
\ No newline at end of file
+    print("="*50 + "\n")
+
+
+def handle_tasks_imported(data: dict):
+    """Handle bulk import summary notification (one per import, not per task)"""
+    user_email = data.get("user_email")
+    imported = data.get("imported")
+    failed = data.get("failed")
+    source = data.get("source")
+
+    logger.info(f"📧 Tasks imported notification for: {user_email}")
+
+    subject = "Task Import Finished"
+    body = f"""Hello!
+    Your task import has finished:
+    Source: {source}
+    Imported: {imported}
+    Failed: {failed}
+
+    Thank you for using our Task management system."""
+
+    success = send_email(user_email, subject, body)
+
+    if not success:
+        logger.error(f"Failed to send email to {user_email}")
+
+
+def handle_task_reminder(data: dict, overdue: bool):
+    """Handle a due-date reminder (due soon or overdue)"""
+    task_id = data.get("task_id")
+    user_email = data.get("user_email")
+    task_title = data.get("task_title")
+    due_date = data.get("due_date")
+
+    if not user_email:
+        # Tasks created before creator emails were recorded have no recipient
+        logger.warning(f"No recipient for due-date reminder of task {task_id}")
+        return
+
+    logger.info(f"📧 Task {'overdue' if overdue else 'due soon'} notification for: {user_email}")
+
+    subject = "Task Overdue" if overdue else "Task Due Soon"
+    body = f"""Hello!
+    {'Your task is past its due date' if overdue else 'Your task is due soon'}:
+    Task ID: {task_id}
+    Title: {task_title}
+    Due: {due_date}
+
+    Thank you for using our Task management system."""
+
+    success = send_email(user_email, subject, body)
+
+    if not success:
+        logger.error(f"Failed to send email to {user_email}")
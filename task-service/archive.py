@@ -0,0 +1,182 @@
+"""
+Archive tier for completed tasks
+
+DONE tasks that haven't changed for ARCHIVE_AFTER_DAYS are moved, with
+their comments, from tasks/comments to tasks_archive/comments_archive, so
+the hot tables (and every index list_tasks and search use) only hold
+live work. Each batch is a single statement in its own transaction:
+copy the comments, delete the tasks (Postgres cascades to the comments),
+insert the deleted rows into the archive, log "archived" tombstones for
+the change feed (see changes.py) and take them out of task_stats.
+
+Archived tasks are read-only. They are reached with ?include_archived=true
+on list_tasks, get_task, list_comments and export; search, stats and
+every write endpoint see the hot set only. A cached copy of an archived
+task may still be served by get_task until its TTL runs out.
+"""
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import logging
+import threading
+import models
+from changes import prune_deletions, upsert_tombstones
+from config import get_settings
+from database import SessionLocal
+from stats import build_stats_upsert, task_deltas
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Columns shared by the hot and archive tables
+TASK_COLUMNS = [column.name for column in models.Task.__table__.columns if column.name != "search_vector"]
+COMMENT_COLUMNS = [column.name for column in models.Comment.__table__.columns]
+
+
+def archive_cutoff(after_days: int = settings.ARCHIVE_AFTER_DAYS) -> datetime:
+    """DONE tasks last updated before this are due for archiving"""
+    return datetime.now(timezone.utc) - timedelta(days=after_days)
+
+
+def build_archive_batch(cutoff: datetime, batch_size: int):
+    """
+    One statement moving up to batch_size archivable tasks and their comments
+
+    SKIP LOCKED leaves tasks that a request is changing right now for the
+    next pass. Returns the counted columns of every archived task.
+    """
+    batch = (
+        select(models.Task.id)
+        .where(models.Task.status == "DONE", models.Task.updated_at < cutoff)
+        .order_by(models.Task.updated_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("batch")
+    )
+
+    # Every part of the statement reads the same snapshot, so the comments are
+    # copied before the cascade from the task delete removes them
+    moved_comments = (
+        insert(models.ArchivedComment)
+        .from_select(
+            COMMENT_COLUMNS,
+            select(*[getattr(models.Comment, name) for name in COMMENT_COLUMNS])
+            .join(batch, models.Comment.task_id == batch.c.id)
+        )
+        .cte("moved_comments")
+    )
+
+    deleted = (
+        delete(models.Task)
+        .where(models.Task.id == batch.c.id)
+        .returning(*[getattr(models.Task, name) for name in TASK_COLUMNS])
+        .cte("deleted")
+    )
+
+    tombstones = upsert_tombstones(
+        postgresql.insert(models.TaskDeletion)
+        .from_select(
+            ["task_id", "deleted_at", "reason"],
+            select(deleted.c.id, func.clock_timestamp(), literal("archived"))
+        )
+    ).cte("tombstones")
+
+    return (
+        insert(models.ArchivedTask)
+        .from_select(
+            [*TASK_COLUMNS, "archived_at"],
+            select(*[deleted.c[name] for name in TASK_COLUMNS], func.now())
+        )
+        .returning(
+            models.ArchivedTask.id,
+            models.ArchivedTask.status,
+            models.ArchivedTask.priority,
+            models.ArchivedTask.assigned_to
+        )
+        .add_cte(moved_comments, tombstones)
+    )
+
+
+def archive_tasks(
+    db: Session,
+    cutoff: Optional[datetime] = None,
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE
+) -> int:
+    """
+    Archive every task due before cutoff, committing once per batch
+
+    Returns:
+        Number of tasks archived
+    """
+    cutoff = cutoff or archive_cutoff()
+    archived = 0
+
+    while True:
+        rows = db.execute(build_archive_batch(cutoff, batch_size)).all()
+        statement = build_stats_upsert(task_deltas(before=rows))
+        if statement is not None:
+            db.execute(statement)
+        db.commit()
+
+        archived += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    if archived:
+        logger.info(f"Archived {archived} completed tasks")
+    return archived
+
+
+class TaskArchiver:
+    """
+    Background thread running archive_tasks every interval seconds
+
+    Each pass also prunes expired change feed tombstones.
+    """
+
+    def __init__(self, session_factory: sessionmaker, interval: float, after_days: int):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.after_days = after_days
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start the archiver thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="task-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the archiver thread"""
+        if not self._thread:
+            return
+
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                with self.session_factory() as db:
+                    # after_days <= 0 disables archiving
+                    if self.after_days > 0:
+                        archive_tasks(db, archive_cutoff(self.after_days))
+                    prune_deletions(db)
+            except Exception as e:
+                logger.error(f"Task archiving failed: {e}")
+
+
+task_archiver = TaskArchiver(
+    session_factory=SessionLocal,
+    interval=settings.ARCHIVE_INTERVAL,
+    after_days=settings.ARCHIVE_AFTER_DAYS
+)
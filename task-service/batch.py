@@ -0,0 +1,121 @@
+"""
+Single-statement SQL for task writes
+Each builder turns a whole request (one task or a /tasks:batch) into one statement.
+"""
+from sqlalchemy import Boolean, bindparam, case, cast, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+import uuid
+import models
+import schemas
+
+# Columns a batch update may change, same as schemas.TaskUpdate
+UPDATABLE_FIELDS = list(schemas.TaskUpdate.model_fields)
+
+
+def build_task_insert(values: dict):
+    """INSERT ... RETURNING the new task, so no refresh SELECT is needed"""
+    return insert(models.Task).values(**values).returning(models.Task)
+
+
+def build_task_update(task_id: uuid.UUID, changes: dict):
+    """
+    One UPDATE ... RETURNING for a single task
+
+    A FOR UPDATE CTE reads the row's counted columns (see stats.py) before the
+    change, so rows come back as (Task, status, priority, assigned_to) with the
+    new task and the old counted values. No row means no such task.
+    """
+    previous = (
+        select(models.Task.id, models.Task.status, models.Task.priority, models.Task.assigned_to)
+        .where(models.Task.id == task_id)
+        .with_for_update()
+        .cte("previous")
+    )
+
+    return (
+        update(models.Task)
+        .where(models.Task.id == previous.c.id)
+        .values(**changes, updated_at=func.clock_timestamp())
+        .returning(models.Task, previous.c.status, previous.c.priority, previous.c.assigned_to)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def build_task_delete(task_id: uuid.UUID):
+    """
+    One DELETE ... RETURNING for a single task, no prior SELECT
+    Returns the counted columns (see stats.py); comments go through ON DELETE CASCADE.
+    """
+    return (
+        delete(models.Task)
+        .where(models.Task.id == task_id)
+        .returning(models.Task.id, models.Task.status, models.Task.priority, models.Task.assigned_to)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _typed_array(values: list, type_):
+    """Bind a list as a typed Postgres array, so NULL elements keep their column type"""
+    return cast(bindparam(None, values, type_=ARRAY(type_)), ARRAY(type_))
+
+
+def build_batch_update(items: list[schemas.TaskBatchUpdateItem]):
+    """
+    One UPDATE ... FROM unnest(...) ... RETURNING for the whole batch
+
+    Each item only changes the fields it sets: for every field there is a
+    set_<field> flag column, and unflagged fields keep their current value.
+    Ids that match no task are simply absent from the RETURNING rows.
+    """
+    columns = models.Task.__table__.c
+    changes = [item.model_dump(exclude_unset=True, exclude={"id"}) for item in items]
+
+    arrays = [_typed_array([item.id for item in items], columns.id.type)]
+    arrays += [_typed_array([change.get(field) for change in changes], columns[field].type) for field in UPDATABLE_FIELDS]
+    arrays += [_typed_array([field in change for change in changes], Boolean()) for field in UPDATABLE_FIELDS]
+
+    batch = (
+        func.unnest(*arrays)
+        .table_valued("id", *UPDATABLE_FIELDS, *[f"set_{field}" for field in UPDATABLE_FIELDS])
+        .render_derived(name="batch")
+    )
+
+    values = {
+        field: case((batch.c[f"set_{field}"], batch.c[field]), else_=columns[field])
+        for field in UPDATABLE_FIELDS
+    }
+
+    return (
+        update(models.Task)
+        .where(models.Task.id == batch.c.id)
+        .values(**values, updated_at=func.clock_timestamp())
+        .returning(models.Task)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def build_batch_lock(ids: list[uuid.UUID]):
+    """
+    SELECT ... FOR UPDATE of the counted columns (see stats.py) of a batch
+    Run before build_batch_update so the counter deltas use the rows' old values.
+    """
+    return (
+        select(models.Task.id, models.Task.status, models.Task.priority, models.Task.assigned_to)
+        .where(models.Task.id == func.any(_typed_array(ids, models.Task.__table__.c.id.type)))
+        .order_by(models.Task.id)
+        .with_for_update()
+    )
+
+
+def build_batch_delete(ids: list[uuid.UUID]):
+    """
+    One DELETE ... WHERE id = ANY(...) RETURNING for the whole batch
+    Returns each deleted task's id and counted columns (see stats.py).
+    Comments go with their tasks through the ON DELETE CASCADE foreign key.
+    """
+    return (
+        delete(models.Task)
+        .where(models.Task.id == func.any(_typed_array(ids, models.Task.__table__.c.id.type)))
+        .returning(models.Task.id, models.Task.status, models.Task.priority, models.Task.assigned_to)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,109 @@
+"""
+Read-through Redis cache of serialized TaskResponse payloads
+
+Each entry is the task's ETag and its JSON payload separated by a newline,
+so a conditional GET can be answered from the cache without a DB read.
+
+The cache is an optimization only: if Redis is unreachable every call
+degrades to a miss/no-op and requests are served from Postgres.
+Writers rewrite or invalidate entries after commit; the TTL bounds
+staleness left by any race between a read-through fill and a write.
+"""
+
+import redis.asyncio as redis
+from redis.asyncio.connection import ConnectionPool
+from redis.exceptions import RedisError
+from typing import Optional, Tuple
+import logging
+import uuid
+from config import get_settings
+from metrics import Counter
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+cache_hits = Counter("task_cache_hits_total", "GET /tasks/{id} served from Redis")
+cache_misses = Counter("task_cache_misses_total", "GET /tasks/{id} that fell through to Postgres")
+cache_errors = Counter("task_cache_errors_total", "Redis errors (treated as misses)")
+
+
+class TaskCache:
+    """Redis cache of task payloads keyed by task id"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.pool: Optional[ConnectionPool] = None
+        self.client: Optional[redis.Redis] = None
+
+    @staticmethod
+    def _key(task_id: uuid.UUID) -> str:
+        return f"task:{task_id}"
+
+    async def connect(self) -> None:
+        """Connect to Redis; on failure run without a cache"""
+        try:
+            self.pool = ConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD or None,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_connect_timeout=2,
+                socket_timeout=2,
+            )
+            self.client = redis.Redis(connection_pool=self.pool)
+            await self.client.ping()
+            logger.info(f"✓ Task cache connected: {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+        except RedisError as e:
+            logger.error(f"Task cache disabled, Redis unavailable: {e}")
+            await self.disconnect()
+
+    async def disconnect(self) -> None:
+        if self.client:
+            await self.client.close()
+        if self.pool:
+            await self.pool.disconnect()
+        self.client = None
+        self.pool = None
+
+    async def get(self, task_id: uuid.UUID) -> Optional[Tuple[str, bytes]]:
+        """Return the cached (etag, payload), or None on a miss"""
+        if not self.client:
+            return None
+        try:
+            payload = await self.client.get(self._key(task_id))
+        except RedisError as e:
+            logger.error(f"Task cache read failed: {e}")
+            cache_errors.inc()
+            payload = None
+
+        if payload is None:
+            cache_misses.inc()
+            return None
+
+        cache_hits.inc()
+        etag, _, body = payload.partition(b"\n")
+        return etag.decode("ascii"), body
+
+    async def set(self, task_id: uuid.UUID, etag: str, payload: str) -> None:
+        """Store a task's ETag and serialized TaskResponse with the configured TTL"""
+        if not self.client:
+            return
+        try:
+            await self.client.set(self._key(task_id), f"{etag}\n{payload}", ex=self.ttl)
+        except RedisError as e:
+            logger.error(f"Task cache write failed: {e}")
+            cache_errors.inc()
+
+    async def invalidate(self, *task_ids: uuid.UUID) -> None:
+        """Drop cached payloads"""
+        if not self.client or not task_ids:
+            return
+        try:
+            await self.client.delete(*[self._key(task_id) for task_id in task_ids])
+        except RedisError as e:
+            logger.error(f"Task cache invalidation failed: {e}")
+            cache_errors.inc()
+
+
+task_cache = TaskCache(ttl=settings.TASK_CACHE_TTL)
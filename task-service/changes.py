@@ -0,0 +1,172 @@
+"""
+Incremental task sync for GET /tasks/changes
+
+The feed is two keyset streams read side by side: tasks by (updated_at, id),
+served by ix_tasks_updated_at_id, and tombstones in task_deletions by
+(deleted_at, task_id). The cursor holds the position in both, so a client
+syncing with ?since=<next_cursor> only receives what changed since its last
+sync instead of the whole task list.
+
+Rows stamped less than CHANGES_SETTLE_SECONDS ago are held back: a write
+stamps updated_at before it commits, so a fresh row could otherwise become
+visible behind a cursor that has already moved past it. When reads go to a
+replica, keep the settle time above the replica lag. Stamps and the horizon
+all come from the database's clock_timestamp(), so clock skew between
+service replicas can't move a change behind the horizon.
+"""
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+import base64
+import uuid
+import models
+from config import get_settings
+
+settings = get_settings()
+
+# Position before every row of a stream
+NIL_ID = uuid.UUID(int=0)
+START = (datetime.min.replace(tzinfo=timezone.utc), NIL_ID)
+
+Position = tuple[datetime, uuid.UUID]
+
+
+def encode_changes_cursor(tasks_after: Position, deletions_after: Position) -> str:
+    """Encode both stream positions into an opaque cursor"""
+    raw = "|".join([
+        tasks_after[0].isoformat(), str(tasks_after[1]),
+        deletions_after[0].isoformat(), str(deletions_after[1]),
+    ])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_changes_cursor(cursor: str) -> tuple[Position, Position]:
+    """
+    Decode a cursor produced by encode_changes_cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        updated_at, task_id, deleted_at, deleted_id = raw.split("|", 3)
+        return (
+            (datetime.fromisoformat(updated_at), uuid.UUID(task_id)),
+            (datetime.fromisoformat(deleted_at), uuid.UUID(deleted_id)),
+        )
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def build_changed_tasks_query(after: Position, horizon: datetime, limit: int):
+    """Tasks created or updated after the position, oldest change first, limit + 1 rows"""
+    return (
+        select(models.Task)
+        .where(
+            tuple_(models.Task.updated_at, models.Task.id) > tuple_(*after),
+            models.Task.updated_at < horizon
+        )
+        .order_by(models.Task.updated_at, models.Task.id)
+        .limit(limit + 1)
+    )
+
+
+def build_deletions_query(after: Position, horizon: datetime, limit: int):
+    """Tombstones recorded after the position, oldest first, limit + 1 rows"""
+    return (
+        select(models.TaskDeletion)
+        .where(
+            tuple_(models.TaskDeletion.deleted_at, models.TaskDeletion.task_id) > tuple_(*after),
+            models.TaskDeletion.deleted_at < horizon
+        )
+        .order_by(models.TaskDeletion.deleted_at, models.TaskDeletion.task_id)
+        .limit(limit + 1)
+    )
+
+
+def build_deletion_log(task_ids: Iterable[uuid.UUID], reason: str = "deleted"):
+    """
+    Upsert of tombstones for tasks removed from tasks, run in the deleting transaction
+
+    An id deleted again (archived then deleted, or re-imported) moves its
+    tombstone forward instead of conflicting with the old one.
+    """
+    tombstones = insert(models.TaskDeletion).values([
+        {"task_id": task_id, "deleted_at": func.clock_timestamp(), "reason": reason}
+        for task_id in task_ids
+    ])
+    return upsert_tombstones(tombstones)
+
+
+def upsert_tombstones(tombstones):
+    """ON CONFLICT clause refreshing an existing tombstone of the same task"""
+    return tombstones.on_conflict_do_update(
+        index_elements=["task_id"],
+        set_={"deleted_at": tombstones.excluded.deleted_at, "reason": tombstones.excluded.reason}
+    )
+
+
+def _next_position(rows: list, limit: int, key, horizon: datetime) -> tuple[Position, bool]:
+    """Where a stream continues and whether it has more rows right now"""
+    if len(rows) > limit:
+        return key(rows[limit - 1]), True
+    # Caught up: everything before the horizon has been returned
+    return (horizon, NIL_ID), False
+
+
+async def read_changes(db, since: Optional[str], limit: int) -> dict:
+    """
+    One page of the change feed as a TaskChanges payload
+
+    Without since, the feed starts from the first task and skips existing
+    tombstones (a new client has nothing to delete).
+
+    Raises:
+        HTTPException: 410 if since predates the tombstone retention
+    """
+    # The horizon is read off the same clock that stamps the rows
+    now = await db.scalar(select(func.clock_timestamp()))
+    horizon = now - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+
+    if since:
+        tasks_after, deletions_after = decode_changes_cursor(since)
+        if deletions_after[0] < now - timedelta(days=settings.CHANGES_RETENTION_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Cursor expired, fetch the full task list again"
+            )
+    else:
+        tasks_after, deletions_after = START, (horizon, NIL_ID)
+
+    tasks = (await db.scalars(build_changed_tasks_query(tasks_after, horizon, limit))).all()
+    deletions = (await db.scalars(build_deletions_query(deletions_after, horizon, limit))).all()
+
+    tasks_after, more_tasks = _next_position(tasks, limit, lambda task: (task.updated_at, task.id), horizon)
+    deletions_after, more_deletions = _next_position(
+        deletions, limit, lambda tombstone: (tombstone.deleted_at, tombstone.task_id), horizon
+    )
+
+    return {
+        "items": tasks[:limit],
+        "deleted": [
+            {"id": tombstone.task_id, "deleted_at": tombstone.deleted_at, "reason": tombstone.reason}
+            for tombstone in deletions[:limit]
+        ],
+        "next_cursor": encode_changes_cursor(tasks_after, deletions_after),
+        "has_more": more_tasks or more_deletions,
+    }
+
+
+def prune_deletions(db: Session, retention_days: int = settings.CHANGES_RETENTION_DAYS) -> int:
+    """Delete tombstones older than the retention, returns how many"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    result = db.execute(delete(models.TaskDeletion).where(models.TaskDeletion.deleted_at < cutoff))
+    db.commit()
+    return result.rowcount
@@ -1,11 +1,31 @@
 """
 Database connection and session management for task_db
+
+Endpoints are written once against the AsyncSession API. With DATABASE_ASYNC
+enabled they get a real asyncpg-backed AsyncSession; otherwise they get a
+ThreadedSession that runs the same calls on a blocking psycopg2 Session in the
+threadpool. Migrations and background jobs always use the sync engine.
+
+Read-only endpoints take get_read_db, which uses the DATABASE_REPLICA_URL pool
+when one is configured. A client that has just written is kept on the primary
+for READ_YOUR_WRITES_SECONDS, so it never reads its own change from a lagging
+replica.
 """
 
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional, Union
 from config import get_settings
+from migrations import run_migrations
+from query_stats import instrument
+from read_your_writes import ReadYourWrites, request_user_id
 
 settings = get_settings()
 
@@ -13,31 +33,218 @@ settings = get_settings()
 engine = create_engine(
     settings.get_database_url(),
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
     echo=settings.DEBUG
 )
 
-#Session factory
+#Replica engine, the primary itself when no replica is configured
+replica_engine = engine
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.get_replica_database_url(),
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+        max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+        echo=settings.DEBUG
+    )
+
+#Count and time every statement, per request and per process (query_stats.py)
+instrument(engine)
+instrument(replica_engine)
+
+#Session factories
 SessionLocal = sessionmaker(
     autoflush=False,
     autocommit= False,
     bind=engine
 )
 
+ReplicaSessionLocal = sessionmaker(
+    autoflush=False,
+    autocommit=False,
+    bind=replica_engine
+)
+
+#Async engines and session factories, only created when enabled
+async_engine = None
+async_replica_engine = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+AsyncReplicaSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        settings.get_async_database_url(),
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        echo=settings.DEBUG
+    )
+
+    async_replica_engine = async_engine
+    if settings.DATABASE_REPLICA_URL:
+        async_replica_engine = create_async_engine(
+            settings.get_async_replica_database_url(),
+            pool_pre_ping=True,
+            pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+            max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+            echo=settings.DEBUG
+        )
+
+    instrument(async_engine)
+    instrument(async_replica_engine)
+
+    # expire_on_commit=False: attributes must not lazy-load after commit in async code
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        async_replica_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
 
 #Base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency for getting database session"""
-    db = SessionLocal()
+class ThreadedResultStream:
+    """Awaitable facade over a server-side cursor Result, like AsyncResult"""
+
+    def __init__(self, result: Result):
+        self.result = result
+
+    async def partitions(self, size: int) -> AsyncIterator[list]:
+        """Yield lists of up to size rows, fetching each batch in the threadpool"""
+        async for partition in iterate_in_threadpool(self.result.partitions(size)):
+            yield partition
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.result.close)
+
+
+class ThreadedSession:
+    """
+    Awaitable facade over a blocking Session
+
+    Mirrors the subset of the AsyncSession API used by the endpoints, running
+    each database call in the threadpool.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: list) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs) -> ThreadedResultStream:
+        """Execute with a server-side cursor, like AsyncSession.stream"""
+        statement = statement.execution_options(stream_results=True)
+        result = await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+        return ThreadedResultStream(result)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance: Any, **kwargs) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, **kwargs)
+
+    async def run_sync(self, fn: Callable, *args, **kwargs):
+        """Call fn(sync_session, *args, **kwargs), like AsyncSession.run_sync"""
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+#Type of the session handed to endpoints
+DBSession = Union[AsyncSession, ThreadedSession]
+
+
+#Users whose reads stay on the primary after a write (read_your_writes.py)
+read_your_writes = ReadYourWrites(window=settings.READ_YOUR_WRITES_SECONDS)
+
+
+@asynccontextmanager
+async def session_scope(read_only: bool = False) -> AsyncIterator[DBSession]:
+    """Open an endpoint session (async or threaded) and close it on exit"""
+    async_factory = AsyncReplicaSessionLocal if read_only else AsyncSessionLocal
+    if async_factory is not None:
+        async with async_factory() as db:
+            yield db
+        return
+
+    db = ThreadedSession((ReplicaSessionLocal if read_only else SessionLocal)())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+async def get_db(request: Request):
+    """Dependency for getting a primary database session (pins the user for reads)"""
+    async with session_scope() as db:
+        yield db
+    await read_your_writes.pin(request_user_id(request))
+
+
+async def get_read_db(request: Request):
+    """Dependency for read-only endpoints: a replica session unless the user just wrote"""
+    pinned = await read_your_writes.is_pinned(request_user_id(request))
+    async with session_scope(read_only=not pinned) as db:
+        yield db
+
+
+def get_session_scope():
+    """
+    Dependency for endpoints whose work outlives the request's dependencies
+
+    Streaming responses are sent after yield-dependencies have exited, so they
+    open their own session with the returned factory instead of using get_db.
+    """
+    return session_scope
+
+
+async def get_read_session_scope(request: Request):
+    """get_session_scope for read-only streaming endpoints, routed like get_read_db"""
+    pinned = await read_your_writes.is_pinned(request_user_id(request))
+    return partial(session_scope, read_only=not pinned)
 
 def init_db():
-    """Create all tables in database"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    """Bring the database schema up to date by applying pending migrations"""
+    run_migrations(engine)
+
+async def close_db():
+    """Dispose of the async engines' pools on shutdown"""
+    if async_replica_engine is not None and async_replica_engine is not async_engine:
+        await async_replica_engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
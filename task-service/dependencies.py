@@ -1,28 +1,83 @@
 """
 Shared dependencies for FastAPI endpoints
-Handles JWT token verification
+Handles JWT token verification, or the gateway's signed identity in trusted gateway mode
 """
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from typing import Optional
 from config import get_settings
+from identity import ASSERTION_HEADER, verify_identity
+from token_cache import TokenCache
 import uuid
 
 settings = get_settings()
-security = HTTPBearer()
+# No bearer token is needed in trusted gateway mode, so get_current_user_id reports a missing one
+security = HTTPBearer(auto_error=False)
+
+# Verified access token -> user id
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+
+def gateway_identity(request: Request) -> tuple[uuid.UUID, str]:
+    """
+    Verify the gateway's identity assertion and return (user_id, email)
+    Checked once per request, the result is kept on request.state.
+    
+    Raises:
+        HTTPException: 401 if the assertion is missing, forged or stale
+    """
+    identity = getattr(request.state, "identity", None)
+    if identity is not None:
+        return identity
+
+    user_id = request.headers.get("X-User-ID", "")
+    email = request.headers.get("X-User-Email", "")
+    assertion = request.headers.get(ASSERTION_HEADER, "")
+
+    try:
+        if not verify_identity(
+            settings.INTERNAL_AUTH_SECRET, user_id, email, assertion, settings.INTERNAL_AUTH_MAX_AGE
+        ):
+            raise ValueError(assertion)
+        identity = (uuid.UUID(user_id), email)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid identity assertion",
+        )
+
+    request.state.identity = identity
+    return identity
 
 
 def get_current_user_id(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> uuid.UUID:
     """
     Verify JWT token and return user_id
-    Does NOT query auth database - just verifies token signature
+    Does NOT query auth database - just verifies token signature.
+    Tokens verified before are answered from token_cache until they expire.
+    In trusted gateway mode only the gateway's identity assertion is checked.
     
     Raises:
         HTTPException: 401 if token invalid or expired
+        HTTPException: 403 if there is no bearer token
     """
+    if settings.INTERNAL_AUTH_SECRET:
+        return gateway_identity(request)[0]
+
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authenticated"
+        )
+
     token = credentials.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     
     try:
         # Decode and verify token
@@ -44,7 +99,9 @@ def get_current_user_id(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return uuid.UUID(user_id)
+        verified = uuid.UUID(user_id)
+        token_cache.put(token, verified, payload.get("exp"))
+        return verified
         
     except JWTError:
         raise HTTPException(
@@ -56,6 +113,7 @@ def get_current_user_id(
 def get_current_user_email(request: Request) -> str:
     """
     Extract user email from X-User-Email header
+    (verified against the identity assertion in trusted gateway mode)
     
     :param request: Incoming request
     :type request: Request
@@ -63,7 +121,10 @@ def get_current_user_email(request: Request) -> str:
     :rtype: str
     """
 
-    email = request.headers.get("X-User-Email")
+    if settings.INTERNAL_AUTH_SECRET:
+        email = gateway_identity(request)[1]
+    else:
+        email = request.headers.get("X-User-Email")
     if not email:
         raise HTTPException(
             status_code = status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,68 @@
+"""
+Strong ETags for conditional GETs
+
+Tags are derived from row versions (id plus updated_at/created_at), never
+from the serialized body, so a matching If-None-Match can be answered with
+304 before any payload is built.
+"""
+
+from fastapi import Request, Response, status
+from typing import Iterable, Optional
+import hashlib
+
+# Bump when TaskResponse/CommentResponse change shape, so clients holding
+# a tag for the old representation refetch
+REPRESENTATION_VERSION = "1"
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(parts: Iterable) -> str:
+    """Quoted strong ETag over the string form of each part"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(REPRESENTATION_VERSION.encode())
+    for part in parts:
+        digest.update(b"\x1f")
+        digest.update(str(part).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def row_etag(rows: Iterable, version_attr: str = "updated_at") -> str:
+    """ETag over the (id, version) pairs of some rows, in order"""
+    return compute_etag(
+        f"{row.id}@{getattr(row, version_attr).isoformat()}" for row in rows
+    )
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match matches etag (weak comparison, per RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def etag_headers(etag: str) -> dict:
+    """Validator headers sent with every conditional-GET response"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 carrying the current validator"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+
+
+def conditional_response(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the client already has etag, else None"""
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    return None
@@ -0,0 +1,205 @@
+"""
+In-process fan-out of task change events for GET /tasks/stream (SSE)
+
+Endpoints publish an event after they commit; the hub encodes it once
+and drops the same frame into the queue of every subscriber whose view
+(the list_tasks filters it subscribed with) it matches. An idle subscriber
+is just a parked coroutine and an empty queue: one hub-wide timer sends
+the keep-alive comments, so there are no per-connection timers.
+
+Events only reach subscribers of this process. A subscriber that falls
+SSE_QUEUE_SIZE events behind gets a "resync" event and is disconnected;
+clients catch up with GET /tasks/changes after a resync or a reconnect.
+"""
+
+from fastapi import HTTPException, status
+from typing import AsyncIterator, Iterable, Optional
+import asyncio
+import json
+import schemas
+from config import get_settings
+from metrics import Counter
+
+settings = get_settings()
+
+events_published = Counter("task_stream_events_total", "Task events published to SSE subscribers")
+resyncs = Counter("task_stream_resyncs_total", "SSE subscribers dropped for falling behind")
+
+# Task columns a subscriber may filter on (list_tasks parameter -> column)
+VIEW_FILTERS = {
+    "status_filter": "status",
+    "priority": "priority",
+    "assigned_to": "assigned_to",
+    "created_by": "created_by",
+}
+
+KEEPALIVE_FRAME = ": keepalive\n\n"
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+
+
+def _frame(event_type: str, data: str) -> str:
+    return f"event: {event_type}\ndata: {data}\n\n"
+
+
+def _column_values(task) -> dict:
+    """Filterable column values of a task or row, as strings (missing columns omitted)"""
+    values = {}
+    for column in VIEW_FILTERS.values():
+        if hasattr(task, column):
+            value = getattr(task, column)
+            values[column] = None if value is None else str(value)
+    return values
+
+
+class Subscription:
+    """One SSE client: its view and its queue of pending frames"""
+
+    def __init__(self, view: dict, queue_size: int):
+        # column -> required value, only for the filters that were given
+        self.view = {
+            VIEW_FILTERS[name]: str(value)
+            for name, value in view.items()
+            if value is not None
+        }
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagging = False
+
+    def matches(self, values: dict) -> bool:
+        """True if a task with these column values is in the view (unknown columns match)"""
+        return all(
+            values[column] == wanted
+            for column, wanted in self.view.items()
+            if column in values
+        )
+
+    def offer(self, frame: str) -> None:
+        """Queue a frame without waiting; a full queue marks the subscriber as lagging"""
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+
+class TaskEventHub:
+    """Fan-out of task events to the SSE subscribers of this process"""
+
+    def __init__(self, queue_size: int, max_subscribers: int, keepalive_interval: float):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.keepalive_interval = keepalive_interval
+
+        self._subscribers: set[Subscription] = set()
+        self._keepalive: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def start(self) -> None:
+        """Start the shared keep-alive timer on the running event loop"""
+        if self._keepalive is None:
+            self._keepalive = asyncio.create_task(self._send_keepalives())
+
+    async def stop(self) -> None:
+        """Stop the keep-alive timer"""
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            try:
+                await self._keepalive
+            except asyncio.CancelledError:
+                pass
+            self._keepalive = None
+
+    def check_capacity(self) -> None:
+        """
+        Raises:
+            HTTPException: 503 if the process already has max_subscribers streams open
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many open event streams"
+            )
+
+    async def frames(self, view: dict) -> AsyncIterator[str]:
+        """Subscribe with a view and yield SSE frames until the client goes away"""
+        subscription = Subscription(view, self.queue_size)
+        self._subscribers.add(subscription)
+        try:
+            # Flush the headers right away so clients and proxies see the stream open
+            yield KEEPALIVE_FRAME
+            while True:
+                if subscription.lagging and subscription.queue.empty():
+                    resyncs.inc()
+                    yield RESYNC_FRAME
+                    return
+                yield await subscription.queue.get()
+        finally:
+            self._subscribers.discard(subscription)
+
+    def publish(
+        self,
+        event_type: str,
+        task_id,
+        data: str,
+        values: dict,
+        previous: Optional[dict] = None
+    ) -> None:
+        """
+        Send one event to every subscriber whose view it falls in
+
+        For updates, previous holds the old column values: a subscriber that
+        only matched the old version gets task_removed, so the task leaves
+        its view.
+        """
+        events_published.inc()
+        frame = _frame(event_type, data)
+        removed = None
+        for subscription in list(self._subscribers):
+            if subscription.matches(values):
+                subscription.offer(frame)
+            elif previous is not None and subscription.matches(previous):
+                removed = removed or _frame("task_removed", json.dumps({"id": str(task_id)}))
+                subscription.offer(removed)
+
+    def tasks_created(self, tasks: Iterable) -> None:
+        """Publish created tasks (ORM objects or TaskResponse)"""
+        for task in tasks:
+            self.publish(
+                "task_created",
+                task.id,
+                schemas.TaskResponse.model_validate(task).model_dump_json(),
+                _column_values(task)
+            )
+
+    def task_updated(self, task, previous=None) -> None:
+        """Publish an updated task; previous is a row with the old column values, if known"""
+        self.publish(
+            "task_updated",
+            task.id,
+            schemas.TaskResponse.model_validate(task).model_dump_json(),
+            _column_values(task),
+            previous=_column_values(previous) if previous is not None else None
+        )
+
+    def tasks_deleted(self, rows: Iterable) -> None:
+        """Publish deleted tasks (rows with at least an id)"""
+        for row in rows:
+            self.publish("task_deleted", row.id, json.dumps({"id": str(row.id)}), _column_values(row))
+
+    async def _send_keepalives(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            for subscription in list(self._subscribers):
+                # Never let a keep-alive push a slow subscriber into lagging
+                if not subscription.queue.full():
+                    subscription.queue.put_nowait(KEEPALIVE_FRAME)
+
+
+task_events = TaskEventHub(
+    queue_size=settings.SSE_QUEUE_SIZE,
+    max_subscribers=settings.SSE_MAX_SUBSCRIBERS,
+    keepalive_interval=settings.SSE_KEEPALIVE_INTERVAL
+)
@@ -0,0 +1,252 @@
+"""
+Bulk task import through Postgres COPY
+
+Loads NDJSON or CSV exports from another tracker far faster than POSTing
+them one by one: input is streamed, validated with schemas.TaskCreate in
+chunks, and each chunk is written with a single COPY in its own
+transaction (with its task_stats deltas). Invalid rows are reported with
+their line number and skipped. One "tasks_imported" notification is
+staged in the outbox for the whole import.
+
+Due-date reminders for imported tasks come from the task-service
+instances: their reminder schedulers pick the committed rows up with the
+catch-up pass of their next scan (reminders.py), tasks due within
+REMINDER_DUE_SOON_HOURS included. Tasks imported while no instance runs
+reminders, more than a reminder window before one starts, get none.
+
+Usage:
+    python importer.py tasks.ndjson --created-by <user id> [--notify-email you@example.com]
+    python importer.py tasks.csv --created-by <user id>
+    cat tasks.ndjson | python importer.py - --format ndjson --created-by <user id>
+"""
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import IO, Iterator, Optional
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+import time
+import uuid
+import schemas
+from config import get_settings
+from database import SessionLocal
+from outbox import add_outbox_message
+from stats import build_stats_upsert, task_deltas
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Column order of the COPY rows; updated_at is left to the database clock
+COPY_COLUMNS = [
+    "id", "title", "description", "status", "priority", "assigned_to", "due_date",
+    "created_by", "creator_email", "comment_count", "created_at",
+]
+
+
+class ImportReport:
+    """Outcome of one import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.errors: list[tuple[int, str]] = []
+        self.started = time.monotonic()
+        self.seconds = 0.0
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.imported / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def read_records(stream: IO[str], input_format: str) -> Iterator[tuple[int, object]]:
+    """
+    Yield (line number, record) pairs from NDJSON or CSV input
+
+    A record that can't be parsed is yielded as the error message string.
+    Empty CSV cells become None.
+    """
+    if input_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, {key: (value if value != "" else None) for key, value in record.items()}
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"invalid JSON: {e.msg}"
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _copy_value(value) -> str:
+    """Encode one value for COPY ... FROM STDIN (text format)"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_tasks(
+    db: Session,
+    tasks: list[schemas.TaskCreate],
+    created_by: uuid.UUID,
+    creator_email: Optional[str] = None
+) -> None:
+    """COPY validated tasks into the tasks table within db's transaction"""
+    now = datetime.now(timezone.utc)
+    buffer = io.StringIO()
+    for task in tasks:
+        row = {
+            **task.model_dump(),
+            "id": uuid.uuid4(),
+            "created_by": created_by,
+            "creator_email": creator_email,
+            "comment_count": 0,
+            "created_at": now,
+        }
+        buffer.write("\t".join(_copy_value(row[column]) for column in COPY_COLUMNS))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY tasks ({', '.join(COPY_COLUMNS)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def import_tasks(
+    db: Session,
+    stream: IO[str],
+    input_format: str,
+    created_by: uuid.UUID,
+    chunk_size: int = settings.IMPORT_CHUNK_SIZE,
+    notify_email: Optional[str] = None,
+    source: str = "import"
+) -> ImportReport:
+    """
+    Validate and load every record of stream, committing once per chunk
+
+    A failure while loading a chunk rolls back that chunk only; earlier
+    chunks stay committed and the exception propagates.
+    """
+    report = ImportReport()
+    chunk: list[schemas.TaskCreate] = []
+
+    def flush() -> None:
+        copy_tasks(db, chunk, created_by, notify_email)
+        db.execute(build_stats_upsert(task_deltas(after=chunk)))
+        db.commit()
+
+        report.imported += len(chunk)
+        chunk.clear()
+        elapsed = time.monotonic() - report.started
+        logger.info(f"Imported {report.imported} tasks ({report.imported / elapsed:.0f} rows/s)")
+
+    try:
+        for line_number, record in read_records(stream, input_format):
+            if isinstance(record, str):
+                report.errors.append((line_number, record))
+                continue
+            try:
+                chunk.append(schemas.TaskCreate.model_validate(record))
+            except ValidationError as e:
+                report.errors.append((line_number, _format_validation_error(e)))
+                continue
+
+            if len(chunk) >= chunk_size:
+                flush()
+
+        if chunk:
+            flush()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        report.seconds = time.monotonic() - report.started
+
+    if notify_email and report.imported:
+        add_outbox_message(
+            db,
+            notification_type="tasks_imported",
+            data={
+                "user_email": notify_email,
+                "source": source,
+                "imported": report.imported,
+                "failed": report.failed
+            }
+        )
+        db.commit()
+
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import tasks from NDJSON or CSV")
+    parser.add_argument("path", help="Input file, or - for stdin")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Input format (default: from the file extension)")
+    parser.add_argument("--created-by", type=uuid.UUID, required=True, help="User id recorded as the tasks' creator")
+    parser.add_argument("--notify-email", help="Send the import summary and the imported tasks' due-date reminders to this address (reminders need a running task-service)")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE, help="Rows per COPY/commit")
+    args = parser.parse_args(argv)
+
+    input_format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+
+    logging.basicConfig(level=logging.INFO)
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    try:
+        with SessionLocal() as db:
+            report = import_tasks(
+                db,
+                stream,
+                input_format,
+                created_by=args.created_by,
+                chunk_size=args.chunk_size,
+                notify_email=args.notify_email,
+                source=args.path
+            )
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    for line_number, message in report.errors:
+        print(f"line {line_number}: {message}", file=sys.stderr)
+    print(json.dumps(report.summary()))
+
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,28 +2,75 @@
 Task Service - FastAPI Application
 Handles task and comment management
 """
-from fastapi import FastAPI, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import false, func, insert, select, tuple_, union_all, update
 from contextlib import asynccontextmanager
-from typing import List, Optional
-from database import get_db, init_db
+from typing import Literal, Optional
+from datetime import datetime
+from database import (
+    DBSession, get_db, get_read_db, get_read_session_scope, init_db, close_db, read_your_writes
+)
 from config import get_settings
 from dependencies import get_current_user_id, get_current_user_email
-from publisher import publish_notification
+from publisher import notification_publisher
+from outbox import add_outbox_message, outbox_relay
+from pagination import decode_cursor, decode_rank_cursor, encode_rank_cursor, keyset_page
+from search import build_search_query
+from changes import build_deletion_log, read_changes
+from export import MEDIA_TYPES, export_query, stream_export
+from batch import (
+    build_batch_update, build_batch_delete, build_batch_lock,
+    build_task_insert, build_task_update, build_task_delete
+)
+from stats import apply_task_deltas, read_stats, stats_reconciler, task_deltas
+from archive import task_archiver
+from reminders import reminder_scheduler
+from cache import task_cache
+from read_your_writes import request_user_id
+from hub import task_events
+from etags import conditional_response, etag_headers, row_etag
+from projection import TASK_FIELDS, parse_fields, project, projected_etag, task_columns
+from serialization import json_response, row_dicts
+import json
+from metrics import render_metrics
+from query_stats import QueryStatsMiddleware
 import models
 import schemas
 import uuid
 
 settings = get_settings()
 
+# Comment columns selected on the fast JSON path, in CommentResponse order
+COMMENT_FIELDS = tuple(schemas.CommentResponse.model_fields)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events"""
     # Startup
     init_db()
+    await task_cache.connect()
+    await read_your_writes.connect()
+    notification_publisher.start()
+    outbox_relay.start()
+    stats_reconciler.start()
+    task_archiver.start()
+    task_events.start()
+    if settings.REMINDERS_ENABLED:
+        reminder_scheduler.start()
     yield
-    # Shutdown (cleanup code would go here if needed)
+    # Shutdown
+    await task_events.stop()
+    await task_cache.disconnect()
+    await read_your_writes.disconnect()
+    await run_in_threadpool(reminder_scheduler.stop)
+    await run_in_threadpool(task_archiver.stop)
+    await run_in_threadpool(stats_reconciler.stop)
+    await run_in_threadpool(outbox_relay.stop)
+    await run_in_threadpool(notification_publisher.stop)
+    await close_db()
 
 
 app = FastAPI(
@@ -33,6 +80,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Server-Timing with each request's SQL statement count and time
+app.add_middleware(QueryStatsMiddleware)
+
 
 # ============================================
 # Health Check
@@ -48,31 +98,39 @@ def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Process metrics in Prometheus text format"""
+    return render_metrics()
+
+
 # ============================================
 # Task Endpoints
 # ============================================
 
 @app.post("/tasks", response_model=schemas.TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task_data: schemas.TaskCreate,
     request: Request,
     current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
-    """Create a new task"""
-    new_task = models.Task(
-        **task_data.model_dump(),
-        created_by=current_user_id
-    )
-    
-    db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
-
+    """Create a new task (one INSERT ... RETURNING, no refresh)"""
     user_email = get_current_user_email(request)
 
-    #Now we publish the message
-    publish_notification(
+    new_task = await db.scalar(
+        build_task_insert({
+            "id": uuid.uuid4(),
+            **task_data.model_dump(),
+            "created_by": current_user_id,
+            "creator_email": user_email
+        })
+    )
+    await apply_task_deltas(db, task_deltas(after=[new_task]))
+
+    #Stage the notification in the same transaction, the outbox relay publishes it
+    add_outbox_message(
+        db,
         notification_type="task_created",
         data={
             "task_id": str(new_task.id),
@@ -80,93 +138,529 @@ def create_task(
             "user_email": user_email
         }
     )
+
+    # Serialize before commit: committing expires the returned object
+    created = schemas.TaskResponse.model_validate(new_task)
+
+    await db.commit()
+    outbox_relay.notify()
+    task_events.tasks_created([created])
+    reminder_scheduler.schedule([created])
     
-    return new_task
+    return created
 
 
-@app.get("/tasks", response_model=List[schemas.TaskResponse])
-def list_tasks(
+def apply_task_filters(
+    query,
     status_filter: Optional[str] = None,
     priority: Optional[str] = None,
     assigned_to: Optional[uuid.UUID] = None,
-    current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    created_by: Optional[uuid.UUID] = None,
+    due_before: Optional[datetime] = None,
+    model=models.Task
 ):
-    """List tasks with optional filters"""
-    query = db.query(models.Task)
-    
-    if status_filter:
-        query = query.filter(models.Task.status == status_filter)
+    """
+    Apply the optional list_tasks filters to a task (or ArchivedTask) query
+
+    Every filter here needs an index behind it on both tables (see models.Task,
+    models.ArchivedTask and tests/test_indexes.py, which fails for an unindexed
+    filter). Archived tasks are all DONE, so status needs no index there.
+    """
+    if status_filter and model is models.ArchivedTask:
+        if status_filter != "DONE":
+            # Nothing to scan: Postgres plans this as a one-time false filter
+            query = query.filter(false())
+    elif status_filter:
+        query = query.filter(model.status == status_filter)
     if priority:
-        query = query.filter(models.Task.priority == priority)
+        query = query.filter(model.priority == priority)
     if assigned_to:
-        query = query.filter(models.Task.assigned_to == assigned_to)
-    
-    return query.all()
+        query = query.filter(model.assigned_to == assigned_to)
+    if created_by:
+        query = query.filter(model.created_by == created_by)
+    if due_before:
+        query = query.filter(model.due_date <= due_before)
+
+    return query
+
+
+def with_archived(hot, archived, limit: Optional[int] = None):
+    """Column selects over tasks and tasks_archive combined with UNION ALL, newest first"""
+    tasks = union_all(hot, archived).subquery()
+    query = select(tasks).order_by(tasks.c.created_at.desc(), tasks.c.id.desc())
+    return query.limit(limit) if limit else query
+
+
+@app.get("/tasks", response_model=schemas.TaskPage)
+async def list_tasks(
+    request: Request,
+    response: Response,
+    status_filter: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    due_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    fields: Optional[str] = None,
+    include_archived: bool = False,
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: DBSession = Depends(get_read_db)
+):
+    """
+    List tasks with optional filters, newest first
+
+    Uses keyset pagination on (created_at, id): pass the returned
+    next_cursor back as ?cursor= to fetch the following page.
+    The page's ETag covers every row's updated_at, so If-None-Match
+    gets a 304 until a task on the page changes.
+    ?fields=id,title,status returns (and selects) only those fields.
+    ?include_archived=true also lists archived tasks (see archive.py).
+    """
+    projection = parse_fields(fields)
+    # Row tuples + orjson for projections and archive unions, and for full
+    # pages when FAST_JSON_RESPONSES is on
+    row_fields = projection or (
+        list(TASK_FIELDS) if settings.FAST_JSON_RESPONSES or include_archived else None
+    )
+    after = decode_cursor(cursor) if cursor else None
+
+    def page_query(model):
+        columns = task_columns(row_fields, "id", "created_at", "updated_at", model=model) if row_fields else [model]
+        query = apply_task_filters(
+            select(*columns),
+            status_filter=status_filter,
+            priority=priority,
+            assigned_to=assigned_to,
+            created_by=created_by,
+            due_before=due_before,
+            model=model
+        )
+        if after:
+            query = query.filter(tuple_(model.created_at, model.id) < tuple_(*after))
+
+        # Fetch one extra row to know whether there is a next page
+        return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+    query = page_query(models.Task)
+    if include_archived:
+        # Each side reads at most limit + 1 rows from its own index
+        query = with_archived(query, page_query(models.ArchivedTask), limit + 1)
+
+    result = await db.execute(query)
+    tasks = result.all() if row_fields else result.scalars().all()
+
+    etag = row_etag(tasks)
+    if projection:
+        etag = projected_etag(etag, projection)
+    not_modified = conditional_response(request, etag)
+    if not_modified:
+        return not_modified
+
+    page = keyset_page(tasks, limit)
+    if row_fields:
+        page["items"] = row_dicts(page["items"], row_fields)
+        return json_response(page, headers=etag_headers(etag))
+
+    response.headers.update(etag_headers(etag))
+    return page
+
+
+@app.get("/tasks/stats", response_model=schemas.TaskStats)
+async def get_task_stats(
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: DBSession = Depends(get_read_db)
+):
+    """Task counts by status, priority and assignee (read from maintained counters)"""
+    return await read_stats(db)
+
+
+@app.get("/tasks/changes", response_model=schemas.TaskChanges)
+async def list_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(settings.PAGE_MAX_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: DBSession = Depends(get_read_db)
+):
+    """
+    Tasks created or updated, and tombstones of tasks deleted or archived, since a cursor
+
+    Start without since, then pass next_cursor back as ?since= on every
+    sync; repeat straight away while has_more is true. A 410 means the
+    cursor outlived CHANGES_RETENTION_DAYS and the client must resync.
+    """
+    return await read_changes(db, since, limit)
+
+
+@app.get("/tasks/stream")
+async def stream_task_events(
+    status_filter: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    current_user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Server-Sent Events for tasks created, updated or deleted in a view
+
+    Takes the list_tasks filters (except due_before) to select the view.
+    Events: task_created/task_updated (TaskResponse), task_deleted and
+    task_removed (left the view) with the id, and resync when this client
+    fell behind; then, or after reconnecting, catch up with /tasks/changes.
+    """
+    task_events.check_capacity()
+    view = {
+        "status_filter": status_filter,
+        "priority": priority,
+        "assigned_to": assigned_to,
+        "created_by": created_by,
+    }
+
+    return StreamingResponse(
+        task_events.frames(view),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/tasks/export")
+async def export_tasks(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    status_filter: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    due_before: Optional[datetime] = None,
+    include_archived: bool = False,
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    session_scope=Depends(get_read_session_scope)
+):
+    """
+    Stream every matching task as NDJSON (default) or CSV, newest first
+
+    Takes the same filters as list_tasks, including include_archived.
+    Rows are streamed from a server-side cursor, so memory use doesn't
+    grow with the result size.
+    """
+    def matching(model):
+        return apply_task_filters(
+            export_query(model),
+            status_filter=status_filter,
+            priority=priority,
+            assigned_to=assigned_to,
+            created_by=created_by,
+            due_before=due_before,
+            model=model
+        )
+
+    if include_archived:
+        query = with_archived(matching(models.Task), matching(models.ArchivedTask))
+    else:
+        query = matching(models.Task).order_by(models.Task.created_at.desc(), models.Task.id.desc())
+
+    return StreamingResponse(
+        stream_export(session_scope, query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'}
+    )
+
+
+@app.get("/tasks/search", response_model=schemas.TaskPage)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: DBSession = Depends(get_read_db)
+):
+    """
+    Full-text search over task titles and descriptions, best match first
+
+    q accepts websearch syntax ("exact phrase", or, -exclude). Pages
+    like list_tasks: pass next_cursor back as ?cursor=.
+    """
+    after = decode_rank_cursor(cursor) if cursor else None
+    rows = (await db.execute(build_search_query(q, limit, after))).all()
+
+    page = keyset_page(
+        rows,
+        limit,
+        key=lambda row: (row.rank, row.Task.created_at, row.Task.id),
+        encode=encode_rank_cursor
+    )
+    page["items"] = [row.Task for row in page["items"]]
+    return page
+
+
+def task_response(etag: str, payload) -> Response:
+    """Serialized TaskResponse with its validators"""
+    return Response(content=payload, media_type="application/json", headers=etag_headers(etag))
 
 
 @app.get("/tasks/{task_id}", response_model=schemas.TaskResponse)
-def get_task(
+async def get_task(
     task_id: uuid.UUID,
+    request: Request,
+    fields: Optional[str] = None,
+    include_archived: bool = False,
     current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
-    """Get a specific task by ID"""
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    """
+    Get a specific task by ID (read-through Redis cache, honours If-None-Match)
+    ?fields=id,title,status returns only those fields.
+    ?include_archived=true falls back to the archive; archived tasks aren't cached.
+    """
+    projection = parse_fields(fields)
+
+    # A user who just wrote reads the primary, so they skip entries a
+    # lagging replica read may have filled
+    pinned = await read_your_writes.is_pinned(request_user_id(request))
+    cached = None if pinned else await task_cache.get(task_id)
+    if cached is not None:
+        etag, payload = cached
+        if projection:
+            etag = projected_etag(etag, projection)
+            return conditional_response(request, etag) or json_response(
+                project(json.loads(payload), projection), headers=etag_headers(etag)
+            )
+        return conditional_response(request, etag) or task_response(etag, payload)
+
+    if projection:
+        # Only the requested columns; the cache is filled by full reads only
+        row = (await db.execute(
+            select(*task_columns(projection, "id", "updated_at")).where(models.Task.id == task_id)
+        )).first()
+        if not row and include_archived:
+            row = (await db.execute(
+                select(*task_columns(projection, "id", "updated_at", model=models.ArchivedTask))
+                .where(models.ArchivedTask.id == task_id)
+            )).first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+        etag = projected_etag(row_etag([row]), projection)
+        return conditional_response(request, etag) or json_response(
+            project(row, projection), headers=etag_headers(etag)
+        )
+
+    task = await db.scalar(select(models.Task).where(models.Task.id == task_id))
+    archived = False
+    if not task and include_archived:
+        task = await db.scalar(select(models.ArchivedTask).where(models.ArchivedTask.id == task_id))
+        archived = task is not None
     
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+
+    etag = row_etag([task])
+    not_modified = conditional_response(request, etag)
+    if not_modified:
+        return not_modified
     
-    return task
+    payload = schemas.TaskResponse.model_validate(task).model_dump_json()
+    if not archived:
+        await task_cache.set(task_id, etag, payload)
+
+    return task_response(etag, payload)
 
 
 @app.put("/tasks/{task_id}", response_model=schemas.TaskResponse)
-def update_task(
+async def update_task(
     task_id: uuid.UUID,
     task_data: schemas.TaskUpdate,
     current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
-    """Update a task"""
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    """
+    Update a task
+    Only the provided fields change, in a single UPDATE ... RETURNING.
+    """
+    update_data = task_data.model_dump(exclude_unset=True)
+
+    if update_data:
+        row = (await db.execute(build_task_update(task_id, update_data))).first()
+        task = row.Task if row else None
+    else:
+        # Nothing to change, so nothing is written and updated_at stays put
+        task = await db.scalar(select(models.Task).where(models.Task.id == task_id))
     
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+
+    if update_data:
+        # row carries the counted columns' old values next to the updated task
+        await apply_task_deltas(db, task_deltas(before=[row], after=[task]))
+
+    etag = row_etag([task])
+    updated = schemas.TaskResponse.model_validate(task)
+    payload = updated.model_dump_json()
+
+    await db.commit()
+
+    # Rewrite the cached entry with the committed state
+    await task_cache.set(task_id, etag, payload)
+    if update_data:
+        task_events.task_updated(updated, previous=row)
+    if "due_date" in update_data or "status" in update_data:
+        reminder_scheduler.schedule([updated])
     
-    # Update only provided fields
-    update_data = task_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(task, key, value)
-    
-    db.commit()
-    db.refresh(task)
-    
-    return task
+    return task_response(etag, payload)
 
 
 @app.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: uuid.UUID,
     current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
-    """Delete a task"""
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    """
+    Delete a task
+    A single DELETE by id; Postgres cascades to the comments.
+    A tombstone is logged for the change feed.
+    """
+    deleted = (await db.execute(build_task_delete(task_id))).first()
     
-    if not task:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    db.delete(task)
-    db.commit()
+    await apply_task_deltas(db, task_deltas(before=[deleted]))
+    await db.execute(build_deletion_log([deleted.id]))
+    await db.commit()
+    await task_cache.invalidate(task_id)
+    task_events.tasks_deleted([deleted])
+
+
+# ============================================
+# Batch Task Endpoints
+# ============================================
+
+@app.post("/tasks:batch", response_model=schemas.TaskBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_tasks_batch(
+    batch: schemas.TaskBatchCreate,
+    request: Request,
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: DBSession = Depends(get_db)
+):
+    """
+    Create many tasks in one transaction
+    One multi-row INSERT for the tasks and one for their notifications.
+    """
+    user_email = get_current_user_email(request)
+
+    rows = [
+        {"id": uuid.uuid4(), **item.model_dump(), "created_by": current_user_id, "creator_email": user_email}
+        for item in batch.items
+    ]
+
+    tasks = (await db.scalars(
+        insert(models.Task).returning(models.Task, sort_by_parameter_order=True),
+        rows
+    )).all()
+    results = [
+        schemas.TaskBatchResult(id=task.id, status="created", task=schemas.TaskResponse.model_validate(task))
+        for task in tasks
+    ]
+    await apply_task_deltas(db, task_deltas(after=tasks))
+
+    await db.execute(
+        insert(models.OutboxMessage),
+        [
+            {
+                "notification_type": "task_created",
+                "payload": {
+                    "task_id": str(row["id"]),
+                    "task_title": row["title"],
+                    "user_email": user_email
+                }
+            }
+            for row in rows
+        ]
+    )
+
+    await db.commit()
+    outbox_relay.notify()
+    task_events.tasks_created(result.task for result in results)
+    reminder_scheduler.schedule(result.task for result in results)
+
+    return {"results": results}
+
+
+@app.patch("/tasks:batch", response_model=schemas.TaskBatchResponse)
+async def update_tasks_batch(
+    batch: schemas.TaskBatchUpdate,
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: DBSession = Depends(get_db)
+):
+    """
+    Update many tasks in one statement
+    Each item changes only the fields it sets; unknown ids are reported as not_found.
+    """
+    previous = (await db.execute(build_batch_lock([item.id for item in batch.items]))).all()
+    updated = (await db.scalars(build_batch_update(batch.items))).all()
+    tasks = {
+        task.id: schemas.TaskResponse.model_validate(task)
+        for task in updated
+    }
+    await apply_task_deltas(db, task_deltas(before=previous, after=updated))
+
+    await db.commit()
+    await task_cache.invalidate(*tasks)
+    for row in previous:
+        if row.id in tasks:
+            task_events.task_updated(tasks[row.id], previous=row)
+    reminder_scheduler.schedule(
+        tasks[item.id] for item in batch.items
+        if item.id in tasks and ({"due_date", "status"} & item.model_fields_set)
+    )
+
+    return {
+        "results": [
+            {"id": item.id, "status": "updated", "task": tasks[item.id]}
+            if item.id in tasks else
+            {"id": item.id, "status": "not_found"}
+            for item in batch.items
+        ]
+    }
+
+
+@app.delete("/tasks:batch", response_model=schemas.TaskBatchResponse)
+async def delete_tasks_batch(
+    batch: schemas.TaskBatchDelete,
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: DBSession = Depends(get_db)
+):
+    """
+    Delete many tasks in one statement
+    Unknown ids are reported as not_found.
+    """
+    rows = (await db.execute(build_batch_delete(batch.ids))).all()
+    await apply_task_deltas(db, task_deltas(before=rows))
+    deleted = {row.id for row in rows}
+    if deleted:
+        await db.execute(build_deletion_log(deleted))
+
+    await db.commit()
+    await task_cache.invalidate(*deleted)
+    task_events.tasks_deleted(rows)
+
+    return {
+        "results": [
+            {"id": task_id, "status": "deleted" if task_id in deleted else "not_found"}
+            for task_id in batch.ids
+        ]
+    }
 
 
 # ============================================
@@ -174,15 +668,21 @@ def delete_task(
 # ============================================
 
 @app.post("/tasks/{task_id}/comments", response_model=schemas.CommentResponse, status_code=status.HTTP_201_CREATED)
-def add_comment(
+async def add_comment(
     task_id: uuid.UUID,
     comment_data: schemas.CommentCreate,
     current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Add a comment to a task"""
-    # Verify task exists
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    # Bump the task's comment counter, which also verifies the task exists
+    task = await db.scalar(
+        update(models.Task)
+        .where(models.Task.id == task_id)
+        .values(comment_count=models.Task.comment_count + 1, updated_at=func.clock_timestamp())
+        .returning(models.Task.id)
+        .execution_options(synchronize_session=False)
+    )
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -196,25 +696,75 @@ def add_comment(
     )
     
     db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
+    await db.commit()
+    await db.refresh(new_comment)
+
+    # comment_count changed
+    await task_cache.invalidate(task_id)
     
     return new_comment
 
 
-@app.get("/tasks/{task_id}/comments", response_model=List[schemas.CommentResponse])
-def list_comments(
+@app.get("/tasks/{task_id}/comments", response_model=schemas.CommentPage)
+async def list_comments(
     task_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    include_archived: bool = False,
     current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
-    """List all comments for a task"""
+    """
+    List comments for a task, oldest first
+
+    Uses keyset pagination on (created_at, id), served by the
+    (task_id, created_at, id) index: pass next_cursor back as ?cursor=.
+    ?include_archived=true also finds archived tasks' comments.
+    """
     # Verify task exists
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = await db.scalar(select(models.Task.id).where(models.Task.id == task_id))
+    comment_model = models.Comment
+    if not task and include_archived:
+        task = await db.scalar(select(models.ArchivedTask.id).where(models.ArchivedTask.id == task_id))
+        comment_model = models.ArchivedComment
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    return task.comments
\ No newline at end of file
+    # Row tuples + orjson when FAST_JSON_RESPONSES is on
+    if settings.FAST_JSON_RESPONSES:
+        query = select(*[getattr(comment_model, name) for name in COMMENT_FIELDS])
+    else:
+        query = select(comment_model)
+    query = query.where(comment_model.task_id == task_id)
+
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(comment_model.created_at, comment_model.id) > tuple_(created_at, comment_id)
+        )
+
+    # Fetch one extra row to know whether there is a next page
+    result = await db.execute(
+        query.order_by(comment_model.created_at, comment_model.id)
+        .limit(limit + 1)
+    )
+    comments = result.all() if settings.FAST_JSON_RESPONSES else result.scalars().all()
+
+    # Comments are immutable, so their ids and created_at identify the page
+    etag = row_etag(comments, version_attr="created_at")
+    not_modified = conditional_response(request, etag)
+    if not_modified:
+        return not_modified
+
+    page = keyset_page(comments, limit)
+    if settings.FAST_JSON_RESPONSES:
+        page["items"] = row_dicts(page["items"], COMMENT_FIELDS)
+        return json_response(page, headers=etag_headers(etag))
+
+    response.headers.update(etag_headers(etag))
+    return page
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Versioned schema migrations for task_db
+Replaces the bare create_all: every schema change is a numbered migration
+that runs exactly once, in order, and is recorded in schema_migrations.
+
+Rules for adding a migration:
+- Append to MIGRATIONS with the next version number, never edit an applied one
+- Keep models.py in sync (tests build the schema from the models)
+- Prefer IF NOT EXISTS so an index pre-built with CREATE INDEX CONCURRENTLY
+  on a large production table is simply skipped here
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from typing import NamedTuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_xact_lock, so concurrent replicas starting up
+# don't race each other applying the same migration
+MIGRATION_LOCK_KEY = 7_420_001
+
+
+class Migration(NamedTuple):
+    """A single schema migration"""
+    version: int
+    description: str
+    statements: list[str]
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline tasks and comments tables", [
+        """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id UUID NOT NULL PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            description TEXT,
+            status VARCHAR(20) NOT NULL,
+            priority VARCHAR(20) NOT NULL,
+            created_by UUID NOT NULL,
+            assigned_to UUID,
+            due_date TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS comments (
+            id UUID NOT NULL PRIMARY KEY,
+            task_id UUID NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+            user_id UUID NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """,
+    ]),
+    Migration(2, "indexes for task filters and comment lookups", [
+        "CREATE INDEX IF NOT EXISTS ix_tasks_created_at_id ON tasks (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_created_at ON tasks (status, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_priority_created_at ON tasks (priority, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_assigned_to_created_at ON tasks (assigned_to, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_created_by_created_at ON tasks (created_by, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_due_date ON tasks (due_date)",
+        "CREATE INDEX IF NOT EXISTS ix_comments_task_id_created_at ON comments (task_id, created_at, id)",
+    ]),
+    Migration(3, "transactional outbox for notifications", [
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id BIGSERIAL PRIMARY KEY,
+            notification_type VARCHAR(50) NOT NULL,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """,
+    ]),
+    Migration(4, "maintained comment_count on tasks", [
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS comment_count INTEGER NOT NULL DEFAULT 0",
+        """
+        UPDATE tasks SET comment_count = counts.total
+        FROM (SELECT task_id, count(*) AS total FROM comments GROUP BY task_id) AS counts
+        WHERE tasks.id = counts.task_id
+        """,
+    ]),
+    # Adding a stored generated column rewrites tasks: schedule it on big tables
+    Migration(5, "full-text search vector on tasks", [
+        """
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+    ]),
+    Migration(6, "task_stats counters", [
+        """
+        CREATE TABLE IF NOT EXISTS task_stats (
+            dimension VARCHAR(20) NOT NULL,
+            value VARCHAR(64) NOT NULL,
+            count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        )
+        """,
+        """
+        INSERT INTO task_stats (dimension, value, count)
+        SELECT 'status', status, count(*) FROM tasks GROUP BY status
+        UNION ALL
+        SELECT 'priority', priority, count(*) FROM tasks GROUP BY priority
+        UNION ALL
+        SELECT 'assigned_to', coalesce(assigned_to::text, ''), count(*) FROM tasks GROUP BY assigned_to
+        ON CONFLICT (dimension, value) DO NOTHING
+        """,
+    ]),
+    Migration(7, "archive tables for completed tasks", [
+        """
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id UUID NOT NULL PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            description TEXT,
+            status VARCHAR(20) NOT NULL,
+            priority VARCHAR(20) NOT NULL,
+            created_by UUID NOT NULL,
+            assigned_to UUID,
+            comment_count INTEGER NOT NULL DEFAULT 0,
+            due_date TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            archived_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS comments_archive (
+            id UUID NOT NULL PRIMARY KEY,
+            task_id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_tasks_archive_created_at_id ON tasks_archive (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_archive_assigned_to_created_at ON tasks_archive (assigned_to, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_archive_created_by_created_at ON tasks_archive (created_by, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_comments_archive_task_id_created_at ON comments_archive (task_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_done_updated_at ON tasks (updated_at) WHERE status = 'DONE'",
+    ]),
+    Migration(8, "change feed: updated_at index and deletion log", [
+        "CREATE INDEX IF NOT EXISTS ix_tasks_updated_at_id ON tasks (updated_at, id)",
+        """
+        CREATE TABLE IF NOT EXISTS task_deletions (
+            task_id UUID NOT NULL PRIMARY KEY,
+            deleted_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            reason VARCHAR(20) NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_task_deletions_deleted_at ON task_deletions (deleted_at, task_id)",
+    ]),
+    Migration(9, "due-date reminders: creator email and watermarks", [
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS creator_email VARCHAR(255)",
+        "ALTER TABLE tasks_archive ADD COLUMN IF NOT EXISTS creator_email VARCHAR(255)",
+        """
+        CREATE TABLE IF NOT EXISTS reminder_watermarks (
+            kind VARCHAR(50) NOT NULL PRIMARY KEY,
+            due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+            task_id UUID NOT NULL
+        )
+        """,
+    ]),
+    Migration(10, "archive: priority and due_date indexes", [
+        "CREATE INDEX IF NOT EXISTS ix_tasks_archive_priority_created_at ON tasks_archive (priority, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_archive_due_date ON tasks_archive (due_date)",
+    ]),
+    Migration(11, "due-date reminders: sent log", [
+        """
+        CREATE TABLE IF NOT EXISTS reminders_sent (
+            task_id UUID NOT NULL,
+            kind VARCHAR(50) NOT NULL,
+            due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (task_id, kind, due_date)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_reminders_sent_due_date ON reminders_sent (due_date)",
+    ]),
+    Migration(12, "outbox: relay leases", [
+        "ALTER TABLE outbox ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP WITH TIME ZONE",
+    ]),
+    Migration(13, "change feed: database clock stamps", [
+        "ALTER TABLE tasks ALTER COLUMN updated_at SET DEFAULT clock_timestamp()",
+        "ALTER TABLE task_deletions ALTER COLUMN deleted_at SET DEFAULT clock_timestamp()",
+    ]),
+]
+
+
+def apply_migrations(conn: Connection) -> list[int]:
+    """
+    Apply pending migrations on an open connection (caller owns the transaction)
+
+    Returns:
+        Versions applied by this call
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+    """))
+
+    applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+    newly_applied = []
+
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+
+        for statement in migration.statements:
+            conn.execute(text(statement))
+
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+            {"version": migration.version, "description": migration.description}
+        )
+        newly_applied.append(migration.version)
+        logger.info(f"Applied migration {migration.version}: {migration.description}")
+
+    return newly_applied
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Apply all pending migrations in a single transaction"""
+    with engine.begin() as conn:
+        return apply_migrations(conn)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, String, Text, DateTime, ForeignKey, Index, BigInteger, Integer, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 import uuid
 from database import Base
@@ -19,13 +19,48 @@ class Task(Base):
 
     created_by = Column(UUID(as_uuid=True), nullable=False)
     assigned_to = Column(UUID(as_uuid=True), nullable=True)
+    # Creator's email at creation time, where due-date reminders go (reminders.py)
+    creator_email = Column(String(255), nullable=True)
+
+    # Maintained by add_comment so responses never COUNT(*) the comments table
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     due_date = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    # Stamped by the database clock, so every replica's writes order the same
+    # way against the change feed's settle horizon (see changes.py)
+    updated_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp(), onupdate=func.clock_timestamp(), nullable=False)
+
+    # Full-text search document, kept up to date by Postgres (see search.py).
+    # Deferred so ordinary task loads don't ship it over the wire
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
+
+    # Relationship to comments. passive_deletes: the FK's ON DELETE CASCADE removes
+    # them in Postgres, the ORM never loads comments just to delete them
+    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
 
-    # Relationship to comments
-    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
+    # One index per list_tasks filter, each ending in the (created_at, id) sort key.
+    # Keep in sync with migrations.py
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_status_created_at", "status", "created_at", "id"),
+        Index("ix_tasks_priority_created_at", "priority", "created_at", "id"),
+        Index("ix_tasks_assigned_to_created_at", "assigned_to", "created_at", "id"),
+        Index("ix_tasks_created_by_created_at", "created_by", "created_at", "id"),
+        Index("ix_tasks_due_date", "due_date"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        # Archive candidates (see archive.py)
+        Index("ix_tasks_done_updated_at", "updated_at", postgresql_where=text("status = 'DONE'")),
+        # Change feed order (see changes.py)
+        Index("ix_tasks_updated_at_id", "updated_at", "id"),
+    )
 
 
 class Comment(Base):
@@ -39,4 +74,113 @@ class Comment(Base):
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
     # Relationship to task
-    task = relationship("Task", back_populates="comments")
\ No newline at end of file
+    task = relationship("Task", back_populates="comments")
+
+    __table_args__ = (
+        Index("ix_comments_task_id_created_at", "task_id", "created_at", "id"),
+    )
+
+
+class ArchivedTask(Base):
+    """DONE task moved out of tasks by archive.py; same columns plus archived_at"""
+    __tablename__ = "tasks_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False)
+    priority = Column(String(20), nullable=False)
+
+    created_by = Column(UUID(as_uuid=True), nullable=False)
+    assigned_to = Column(UUID(as_uuid=True), nullable=True)
+    creator_email = Column(String(255), nullable=True)
+
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    due_date = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Only reached with ?include_archived=true; list order and every list_tasks
+    # filter but status (archived tasks are all DONE, see apply_task_filters).
+    # Keep in sync with migrations.py
+    __table_args__ = (
+        Index("ix_tasks_archive_created_at_id", "created_at", "id"),
+        Index("ix_tasks_archive_priority_created_at", "priority", "created_at", "id"),
+        Index("ix_tasks_archive_assigned_to_created_at", "assigned_to", "created_at", "id"),
+        Index("ix_tasks_archive_created_by_created_at", "created_by", "created_at", "id"),
+        Index("ix_tasks_archive_due_date", "due_date"),
+    )
+
+
+class ArchivedComment(Base):
+    """Comment of an archived task"""
+    __tablename__ = "comments_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_comments_archive_task_id_created_at", "task_id", "created_at", "id"),
+    )
+
+
+class TaskDeletion(Base):
+    """Tombstone of a task removed from tasks, served by GET /tasks/changes (see changes.py)"""
+    __tablename__ = "task_deletions"
+
+    task_id = Column(UUID(as_uuid=True), primary_key=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False)
+    reason = Column(String(20), default="deleted", nullable=False)
+
+    __table_args__ = (
+        Index("ix_task_deletions_deleted_at", "deleted_at", "task_id"),
+    )
+
+
+class ReminderWatermark(Base):
+    """Position the reminder scans resume from, per reminder kind (see reminders.py)"""
+    __tablename__ = "reminder_watermarks"
+
+    kind = Column(String(50), primary_key=True)
+    due_date = Column(DateTime(timezone=True), nullable=False)
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+
+
+class ReminderSent(Base):
+    """A reminder staged in the outbox, at most one per task, kind and due date (see reminders.py)"""
+    __tablename__ = "reminders_sent"
+
+    task_id = Column(UUID(as_uuid=True), primary_key=True)
+    kind = Column(String(50), primary_key=True)
+    due_date = Column(DateTime(timezone=True), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_reminders_sent_due_date", "due_date"),
+    )
+
+
+class TaskStat(Base):
+    """Task counter for one (dimension, value) group, maintained by stats.py"""
+    __tablename__ = "task_stats"
+
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(64), primary_key=True)
+    count = Column(BigInteger, default=0, server_default="0", nullable=False)
+
+
+class OutboxMessage(Base):
+    """Notification waiting to be relayed to RabbitMQ (transactional outbox)"""
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    notification_type = Column(String(50), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Lease of the relay publishing the row, NULL while unclaimed (see outbox.py)
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
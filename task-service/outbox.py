@@ -0,0 +1,208 @@
+"""
+Transactional outbox for task notifications
+
+Endpoints add an OutboxMessage in the same transaction as the change it
+describes, so a notification exists if and only if the change committed.
+A background relay drains the outbox to RabbitMQ in batches and deletes
+rows only after the broker confirms them: delivery is at-least-once and
+request latency no longer depends on the broker.
+
+A batch is claimed in a short transaction that stamps its rows with a
+lease (claimed_until) and commits before anything is published, so no row
+lock or transaction stays open while the relay waits for confirms. Other
+replicas skip leased rows; rows of a relay that died are claimed again
+once their lease runs out.
+"""
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from concurrent.futures import Future, wait
+from datetime import timedelta
+from typing import Optional
+import logging
+import threading
+import models
+from config import get_settings
+from database import SessionLocal
+from publisher import NotificationPublisher, PublisherQueueFull, notification_publisher
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def add_outbox_message(db, notification_type: str, data: dict) -> models.OutboxMessage:
+    """
+    Stage a notification in the caller's transaction
+
+    :param db: Session (sync, async or threaded) the change is written with
+    :param notification_type: Type of notification(task_created, task_updated)
+    :param data: Notification data
+    """
+    message = models.OutboxMessage(notification_type=notification_type, payload=data)
+    db.add(message)
+    return message
+
+
+class OutboxRelay:
+    """Background thread moving outbox rows to RabbitMQ"""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        publisher: NotificationPublisher,
+        batch_size: int,
+        poll_interval: float,
+        confirm_timeout: float,
+        lease: float
+    ):
+        self.session_factory = session_factory
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.confirm_timeout = confirm_timeout
+        self.lease = timedelta(seconds=lease)
+
+        # Outbox id -> Future of its last publish, so rows still awaiting a
+        # confirm are not enqueued again while the broker is slow or down
+        self._in_flight: dict[int, Future] = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+
+    def notify(self) -> None:
+        """Wake the relay after a commit instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the relay thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the relay thread; undelivered rows stay in the outbox"""
+        if not self._thread:
+            return
+
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def relay_once(self, db: Session) -> int:
+        """
+        Publish one batch of outbox rows and delete the confirmed ones
+
+        Rows are claimed with SKIP LOCKED so several service replicas can relay
+        concurrently without sending the same row twice. Rows still awaiting a
+        confirm keep their lease and are settled by a later call.
+
+        Returns:
+            Number of rows delivered
+        """
+        settled = self._settle(db)
+
+        claimable = (
+            select(models.OutboxMessage.id)
+            .where(or_(
+                models.OutboxMessage.claimed_until.is_(None),
+                models.OutboxMessage.claimed_until < func.now()
+            ))
+            .order_by(models.OutboxMessage.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        messages = sorted(db.execute(
+            update(models.OutboxMessage)
+            .where(models.OutboxMessage.id.in_(claimable))
+            .values(claimed_until=func.now() + self.lease)
+            .returning(models.OutboxMessage.id, models.OutboxMessage.notification_type, models.OutboxMessage.payload)
+            .execution_options(synchronize_session=False)
+        ).all())
+        db.commit()
+
+        if not messages:
+            return settled
+
+        futures = {}
+        for message in messages:
+            future = self._in_flight.get(message.id)
+            if future is None or (future.done() and future.exception() is not None):
+                try:
+                    future = self.publisher.publish({
+                        "type": message.notification_type,
+                        "message_id": message.id,
+                        **message.payload
+                    })
+                except PublisherQueueFull:
+                    # Leave the rest for the next batch
+                    break
+                self._in_flight[message.id] = future
+            futures[message.id] = future
+
+        wait(futures.values(), timeout=self.confirm_timeout)
+        # Claimed but not published: free them for the next batch
+        unpublished = [message.id for message in messages if message.id not in futures]
+        if unpublished:
+            db.execute(
+                update(models.OutboxMessage)
+                .where(models.OutboxMessage.id.in_(unpublished))
+                .values(claimed_until=None)
+                .execution_options(synchronize_session=False)
+            )
+        return settled + self._settle(db)
+
+    def _settle(self, db: Session) -> int:
+        """
+        Delete the rows whose publish was confirmed and release those whose publish failed
+
+        Returns:
+            Number of rows delivered
+        """
+        delivered, failed = [], []
+        for message_id, future in self._in_flight.items():
+            if future.done():
+                (failed if future.exception() is not None else delivered).append(message_id)
+
+        if delivered:
+            db.execute(delete(models.OutboxMessage).where(models.OutboxMessage.id.in_(delivered)))
+        if failed:
+            db.execute(
+                update(models.OutboxMessage)
+                .where(models.OutboxMessage.id.in_(failed))
+                .values(claimed_until=None)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+        for message_id in delivered + failed:
+            del self._in_flight[message_id]
+        return len(delivered)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            delivered = 0
+            try:
+                with self.session_factory() as db:
+                    delivered = self.relay_once(db)
+            except Exception as e:
+                logger.error(f"Outbox relay failed: {e}")
+
+            # A full batch means there is probably more waiting
+            if delivered < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+outbox_relay = OutboxRelay(
+    session_factory=SessionLocal,
+    publisher=notification_publisher,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    confirm_timeout=settings.OUTBOX_CONFIRM_TIMEOUT,
+    lease=settings.OUTBOX_LEASE_SECONDS
+)
@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque, url-safe tokens encoding the sort key of the last row on a page
+"""
+from fastapi import HTTPException, status
+from datetime import datetime
+from typing import Any, Callable, Sequence
+import base64
+import uuid
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """Encode a (created_at, id) sort key into an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def encode_rank_cursor(rank: float, created_at: datetime, row_id: uuid.UUID) -> str:
+    """Encode a (rank, created_at, id) search sort key into an opaque cursor"""
+    raw = f"{rank!r}|{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_rank_cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        rank, created_at, row_id = raw.split("|", 2)
+        return float(rank), datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_page(
+    rows: Sequence[Any],
+    limit: int,
+    key: Callable[[Any], tuple] = lambda row: (row.created_at, row.id),
+    encode: Callable[..., str] = encode_cursor
+) -> dict:
+    """
+    Build a page from rows fetched with LIMIT limit + 1
+
+    The extra row only tells us whether another page exists; it is not returned.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode(*key(items[-1]))
+
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,53 @@
+"""
+Sparse field projection for task responses (?fields=id,title,status)
+
+A projected request selects only the requested columns (plus the ones
+pagination and ETags need) and goes through the fast JSON path in
+serialization.py, skipping the ORM entity and the TaskResponse model build.
+"""
+
+from fastapi import HTTPException, status
+from typing import Any, Optional
+import models
+import schemas
+from etags import compute_etag
+
+# Fields a client may ask for, in TaskResponse order
+TASK_FIELDS = tuple(schemas.TaskResponse.model_fields)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[list[str]]:
+    """
+    Parse a comma separated ?fields= value, None meaning the full representation
+
+    Raises:
+        HTTPException: 400 on an empty list or unknown field names
+    """
+    if fields is None:
+        return None
+
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in TASK_FIELDS]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+        )
+    return requested
+
+
+def task_columns(fields: list[str], *required: str, model=models.Task) -> list:
+    """Task (or ArchivedTask) columns for fields followed by the required ones, without duplicates"""
+    return [getattr(model, name) for name in dict.fromkeys([*fields, *required])]
+
+
+def project(row: Any, fields: list[str]) -> dict:
+    """The requested fields of a mapping, or of a row selected with task_columns(fields, ...)"""
+    if isinstance(row, dict):
+        return {name: row[name] for name in fields}
+    return dict(zip(fields, row))
+
+
+def projected_etag(etag: str, fields: list[str]) -> str:
+    """ETag of a projection, derived from the full representation's ETag"""
+    return compute_etag([etag, ",".join(fields)])
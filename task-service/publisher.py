@@ -1,26 +1,161 @@
 """
 On Task creation/update publish notification messages
+
+A single long-lived publisher owns the RabbitMQ connection on a background
+thread (pika connections are not thread safe). Its caller, the outbox relay
+(outbox.py), only appends to an in-memory queue; the thread publishes in
+batches on a confirm channel, resolves each message's Future when the broker
+acks it, and reconnects with a delay after connection loss, re-sending
+anything not yet confirmed.
 """
 
 import pika
 import json
 import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional
 from config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-def publish_notification(notification_type: str, data: dict):
-    """
-    Publishes message to rabbitmq
-    
-    :param notification_type: Type of notification(task_created, task_updated)
-    :type notification_type: str
-    :param data: Notification data
-    :type data: dict
-    """
-
-    try:
+
+class PublisherQueueFull(Exception):
+    """Raised when the in-memory publish queue is at capacity"""
+
+
+class NotificationPublisher:
+    """Persistent RabbitMQ publisher with batched publisher confirms"""
+
+    def __init__(
+        self,
+        queue_name: str,
+        max_queue_size: int,
+        batch_size: int,
+        max_in_flight: int,
+        reconnect_delay: float
+    ):
+        self.queue_name = queue_name
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.reconnect_delay = reconnect_delay
+
+        # Filled by request handlers, drained by the publisher thread
+        self._queue: "queue.Queue[tuple[bytes, Future]]" = queue.Queue(maxsize=max_queue_size)
+
+        # Owned by the publisher thread only
+        self._retry: deque[tuple[bytes, Future]] = deque()
+        self._outstanding: dict[int, tuple[bytes, Future]] = {}
+        self._delivery_tag = 0
+        self._connection: Optional[pika.SelectConnection] = None
+        self._channel = None
+        self._ready = False
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._wake_lock = threading.Lock()
+        self._drain_scheduled = False
+
+    # ============================================
+    # Producer side (any thread)
+    # ============================================
+
+    def publish(self, message: dict) -> Future:
+        """
+        Enqueue a message for publishing
+
+        Returns a Future resolved once the broker confirms the message.
+
+        Raises:
+            PublisherQueueFull: if the in-memory queue is at capacity
+        """
+        future: Future = Future()
+        body = json.dumps(message).encode("utf-8")
+
+        try:
+            self._queue.put_nowait((body, future))
+        except queue.Full:
+            raise PublisherQueueFull(f"Publish queue full ({self._queue.maxsize} messages)")
+
+        self._wake()
+        return future
+
+    def pending(self) -> int:
+        """Number of messages queued or awaiting broker confirmation"""
+        return self._queue.qsize() + len(self._retry) + len(self._outstanding)
+
+    def start(self) -> None:
+        """Start the publisher thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush pending messages (up to timeout seconds) and close the connection"""
+        if not self._thread:
+            return
+
+        deadline = time.monotonic() + timeout
+        while self.pending() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self._stopping.set()
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._close)
+            except Exception as e:
+                logger.error(f"Failed to schedule publisher shutdown: {e}")
+
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+        if self.pending():
+            logger.error(f"Publisher stopped with {self.pending()} unconfirmed messages")
+            self._fail_pending(ConnectionError("Publisher stopped before broker confirmed"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail every queued or unconfirmed message (publisher thread is gone)"""
+        entries = list(self._retry) + list(self._outstanding.values())
+        self._retry.clear()
+        self._outstanding.clear()
+        while True:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for _, future in entries:
+            if not future.done():
+                future.set_exception(error)
+
+    def _wake(self) -> None:
+        """Ask the publisher thread to drain the queue, coalescing repeated calls"""
+        with self._wake_lock:
+            if self._drain_scheduled or not self._ready:
+                return
+            self._drain_scheduled = True
+
+        try:
+            self._connection.ioloop.add_callback_threadsafe(self._drain)
+        except Exception:
+            # Connection is going away; the next channel open drains the queue
+            with self._wake_lock:
+                self._drain_scheduled = False
+
+    # ============================================
+    # Publisher thread
+    # ============================================
+
+    def _run(self) -> None:
+        """Connect, run the IO loop until the connection drops, then reconnect"""
         credentials = pika.PlainCredentials(
             settings.RABBITMQ_USER,
             settings.RABBITMQ_PASSWORD
@@ -32,26 +167,148 @@ def publish_notification(notification_type: str, data: dict):
             credentials=credentials
         )
 
-        connection = pika.BlockingConnection(parameters)
-        channel = connection.channel()
-
-        message = {
-            "type": notification_type,
-            **data
-        }
-        
-        channel.basic_publish(
-            exchange='',
-            routing_key=settings.RABBITMQ_QUEUE,
-            body=json.dumps(message),
-            properties=pika.BasicProperties(
-                delivery_mode=2
-            )
+        while not self._stopping.is_set():
+            try:
+                self._connection = pika.SelectConnection(
+                    parameters,
+                    on_open_callback=self._on_connection_open,
+                    on_open_error_callback=self._on_connection_open_error,
+                    on_close_callback=self._on_connection_closed
+                )
+                self._connection.ioloop.start()
+            except Exception as e:
+                logger.error(f"Publisher connection error: {e}")
+
+            self._connection = None
+            if not self._stopping.is_set():
+                self._stopping.wait(self.reconnect_delay)
+
+    def _on_connection_open(self, connection) -> None:
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, connection, error) -> None:
+        logger.error(f"Failed to connect to RabbitMQ: {error}")
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason) -> None:
+        self._reset_channel()
+        if not self._stopping.is_set():
+            logger.warning(f"RabbitMQ connection closed, reconnecting: {reason}")
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel) -> None:
+        self._channel = channel
+        self._delivery_tag = 0
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.queue_declare(queue=self.queue_name, durable=True, callback=self._on_queue_declared)
+
+    def _on_channel_closed(self, channel, reason) -> None:
+        logger.warning(f"RabbitMQ channel closed: {reason}")
+        self._reset_channel()
+        if self._connection and self._connection.is_open:
+            self._connection.close()
+
+    def _on_queue_declared(self, frame) -> None:
+        self._channel.confirm_delivery(
+            ack_nack_callback=self._on_delivery_confirmation,
+            callback=self._on_confirm_selected
         )
-        
-        logger.info(f"Published notification: {notification_type}")
 
-        connection.close()
-    except Exception as e:
-        logger.error(f"Failed to publish notification: {e}")
-        
\ No newline at end of file
+    def _on_confirm_selected(self, frame) -> None:
+        logger.info(f"✓ Publisher ready: {settings.RABBITMQ_HOST}:{settings.RABBITMQ_PORT}")
+        with self._wake_lock:
+            self._ready = True
+            self._drain_scheduled = True
+        self._drain()
+
+    def _on_delivery_confirmation(self, frame) -> None:
+        """Resolve futures for an Ack/Nack, which may cover many delivery tags"""
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+
+        if method.multiple:
+            tags = [tag for tag in self._outstanding if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag]
+
+        for tag in sorted(tags):
+            entry = self._outstanding.pop(tag, None)
+            if entry is None:
+                continue
+            if acked:
+                if not entry[1].done():
+                    entry[1].set_result(None)
+            else:
+                # Broker refused it; try again on the next drain
+                self._retry.append(entry)
+
+        self._drain()
+
+    def _reset_channel(self) -> None:
+        """Forget the channel and queue unconfirmed messages for re-sending, in order"""
+        with self._wake_lock:
+            self._ready = False
+            self._drain_scheduled = False
+
+        self._channel = None
+        for tag in sorted(self._outstanding, reverse=True):
+            self._retry.appendleft(self._outstanding[tag])
+        self._outstanding.clear()
+
+    def _next_message(self) -> Optional[tuple[bytes, Future]]:
+        if self._retry:
+            return self._retry.popleft()
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _drain(self) -> None:
+        """Publish up to batch_size messages without waiting for their confirms"""
+        with self._wake_lock:
+            self._drain_scheduled = False
+
+        if not self._ready or self._channel is None:
+            return
+
+        published = 0
+        while published < self.batch_size and len(self._outstanding) < self.max_in_flight:
+            entry = self._next_message()
+            if entry is None:
+                return
+
+            try:
+                self._channel.basic_publish(
+                    exchange='',
+                    routing_key=self.queue_name,
+                    body=entry[0],
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,
+                        content_type="application/json"
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to publish notification: {e}")
+                self._retry.appendleft(entry)
+                return
+
+            self._delivery_tag += 1
+            self._outstanding[self._delivery_tag] = entry
+            published += 1
+
+        # More to send: yield to the IO loop so confirms get processed, then continue
+        if len(self._outstanding) < self.max_in_flight:
+            self._wake()
+
+    def _close(self) -> None:
+        if self._connection and not self._connection.is_closed:
+            self._connection.close()
+
+
+notification_publisher = NotificationPublisher(
+    queue_name=settings.RABBITMQ_QUEUE,
+    max_queue_size=settings.RABBITMQ_PUBLISH_QUEUE_SIZE,
+    batch_size=settings.RABBITMQ_PUBLISH_BATCH_SIZE,
+    max_in_flight=settings.RABBITMQ_MAX_IN_FLIGHT,
+    reconnect_delay=settings.RABBITMQ_RECONNECT_DELAY
+)
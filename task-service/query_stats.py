@@ -0,0 +1,98 @@
+"""
+Per-request SQL statement counts and time
+
+Engine event hooks count and time every statement. The totals feed the
+process counters on /metrics and, through a context variable set by
+QueryStatsMiddleware, the current request, which reports them in its
+Server-Timing header:
+
+    Server-Timing: db;dur=3.42;desc="5 queries"
+
+so an N+1 shows up as a query count growing with the data. The header is
+sent with the response headers: statements a streaming response runs while
+sending its body are only counted in the metrics.
+
+Kept identical in auth-service and task-service.
+"""
+
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from typing import Optional
+import time
+from metrics import Counter
+
+statements_total = Counter("db_statements_total", "SQL statements executed")
+statement_seconds_total = Counter("db_statement_seconds_total", "Seconds spent executing SQL statements")
+requests_total = Counter("http_requests_total", "HTTP requests served")
+
+
+class QueryStats:
+    """Statements run on behalf of one request"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being served, None outside a request"""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    statements_total.inc()
+    statement_seconds_total.inc(elapsed)
+
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+
+def instrument(engine) -> None:
+    """Count and time the statements of an engine (an AsyncEngine's sync_engine for async ones)"""
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware collecting each HTTP request's statements into a Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requests_total.inc()
+        stats = QueryStats()
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        # Threadpool calls copy the context, so they add to the same QueryStats
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,128 @@
+"""
+Read-your-writes: keep a user's reads on the primary right after they write
+
+A write pins its user for READ_YOUR_WRITES_SECONDS, and get_read_db sends a
+pinned user's reads to the primary instead of a replica that may not have
+replayed the write yet. Pins are keyed by user id, not by token or
+connection, so they hold across token refreshes and across services, and
+live in Redis as
+
+    ryw:<user id>  (expiring after the window)
+
+so every instance behind the gateway sees them. Without Redis they fall
+back to this process's memory; when a Redis call fails the user is treated
+as pinned, since the primary is always up to date.
+
+This module is the asyncio twin of auth-service's read_your_writes.py;
+request_user_id is kept identical in both.
+"""
+
+from fastapi import Request
+from jose import jwt, JWTError
+from redis.exceptions import RedisError
+from typing import Optional
+import redis.asyncio as redis
+import logging
+import threading
+import time
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def request_user_id(request: Request) -> Optional[str]:
+    """
+    The user a request acts for: the gateway's X-User-ID, else the subject of
+    its bearer token. Only used to pick a database, so the token isn't
+    verified here; the endpoint's own authentication still is.
+    """
+    user_id = request.headers.get("X-User-ID")
+    if user_id:
+        return user_id
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return str(subject) if subject else None
+
+
+class ReadYourWrites:
+    """Users who wrote in the last `window` seconds, whose reads must use the primary"""
+
+    def __init__(self, window: float):
+        self.window = window
+        self.client: Optional[redis.Redis] = None
+
+        # Fallback pins while Redis isn't connected: user id -> deadline
+        self._local: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"ryw:{user_id}"
+
+    async def connect(self) -> None:
+        """Share pins through Redis; on failure keep them in this process"""
+        client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD or None,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        try:
+            await client.ping()
+        except RedisError as e:
+            logger.error(f"Read-your-writes pins kept in process, Redis unavailable: {e}")
+            await client.close()
+            return
+        self.client = client
+
+    async def disconnect(self) -> None:
+        if self.client:
+            await self.client.close()
+        self.client = None
+
+    async def pin(self, user_id: Optional[str]) -> None:
+        """Keep the user's reads on the primary for the next window seconds"""
+        if not user_id or self.window <= 0:
+            return
+
+        if self.client:
+            try:
+                await self.client.set(self._key(user_id), 1, px=max(int(self.window * 1000), 1))
+                return
+            except RedisError as e:
+                logger.error(f"Read-your-writes pin failed, kept in process: {e}")
+
+        now = time.monotonic()
+        with self._lock:
+            self._local[user_id] = now + self.window
+            # Drop expired pins at most once per window
+            if now >= self._next_prune:
+                self._local = {k: deadline for k, deadline in self._local.items() if deadline > now}
+                self._next_prune = now + self.window
+
+    async def is_pinned(self, user_id: Optional[str]) -> bool:
+        """True if the user wrote within the window (or Redis can't tell)"""
+        if not user_id:
+            return False
+
+        deadline = self._local.get(user_id)
+        if deadline is not None and deadline > time.monotonic():
+            return True
+
+        if self.client:
+            try:
+                return bool(await self.client.exists(self._key(user_id)))
+            except RedisError as e:
+                logger.error(f"Read-your-writes check failed, reading the primary: {e}")
+                return True
+        return False
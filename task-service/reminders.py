@@ -0,0 +1,397 @@
+"""
+Due-date reminders: "task_due_soon" and "task_overdue" notifications
+
+A background thread keeps the reminders of the next REMINDER_WINDOW_SECONDS
+in a bounded in-memory timer heap. The heap is topped up by range scans
+over ix_tasks_due_date that continue from the (due_date, id) position the
+previous scan stopped at, so each open task is read once per reminder, not
+once per poll. A due timer stages its notification in the outbox.
+
+Every reminder staged is recorded in reminders_sent under its (task, kind,
+due_date), in the same transaction as its outbox row and only if the row is
+new: replicas that loaded the same timers send each reminder once. Per kind,
+reminder_watermarks holds the furthest position fired, which a restart
+resumes scanning from; it only ever moves forward.
+
+Timers are checked against the task when they fire, so tasks that were
+completed, deleted or rescheduled in the meantime are skipped. Tasks created
+or rescheduled behind the scan positions are added with schedule() by the
+endpoints of this process. The importer's and other replicas' writes are
+picked up by a catch-up pass over ix_tasks_updated_at_id that each scan runs
+for the tasks written since the previous one (with CATCH_UP_OVERLAP to spare
+for commit lag and clock skew); only writes made while no scheduler ran,
+more than a window before it started, are missed.
+"""
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, sessionmaker
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, NamedTuple, Optional
+import heapq
+import logging
+import threading
+import time
+import uuid
+import models
+from config import get_settings
+from database import SessionLocal
+from metrics import Counter
+from outbox import add_outbox_message, outbox_relay
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+reminders_sent = Counter("task_reminders_sent_total", "Due-date reminders staged in the outbox")
+
+# Positions after and before every task with the same timestamp
+MAX_ID = uuid.UUID(int=2**128 - 1)
+MIN_ID = uuid.UUID(int=0)
+
+# How far before the previous scan the catch-up pass starts: a write
+# committed late, or stamped by a slower clock, is still seen
+CATCH_UP_OVERLAP = timedelta(minutes=5)
+
+# reminders_sent rows are kept this long past their due date, well after
+# any replica could still fire them
+SENT_RETENTION = timedelta(days=1)
+
+Position = tuple[datetime, uuid.UUID]
+
+
+class ReminderKind(NamedTuple):
+    """A reminder sent lead before due_date; name is its notification type"""
+    name: str
+    lead: timedelta
+
+
+class Timer(NamedTuple):
+    fire_at: datetime
+    due_date: datetime
+    task_id: uuid.UUID
+    kind: str
+
+
+KINDS = (
+    ReminderKind("task_due_soon", timedelta(hours=settings.REMINDER_DUE_SOON_HOURS)),
+    ReminderKind("task_overdue", timedelta(0)),
+)
+
+
+def build_due_scan(after: Position, until: datetime, limit: int):
+    """Open tasks due after the position and no later than until, in due_date order"""
+    return (
+        select(models.Task.id, models.Task.due_date)
+        .where(
+            # The plain range lets Postgres walk ix_tasks_due_date, the row
+            # comparison skips what the previous scan already loaded
+            models.Task.due_date >= after[0],
+            tuple_(models.Task.due_date, models.Task.id) > tuple_(*after),
+            models.Task.due_date <= until,
+            models.Task.status != "DONE"
+        )
+        .order_by(models.Task.due_date, models.Task.id)
+        .limit(limit)
+    )
+
+
+def build_catch_up_scan(after: Position, now: datetime, until: datetime, limit: int):
+    """Open tasks written after the (updated_at, id) position that are due between now and until, in write order"""
+    return (
+        select(models.Task.id, models.Task.due_date, models.Task.updated_at)
+        .where(
+            models.Task.updated_at >= after[0],
+            tuple_(models.Task.updated_at, models.Task.id) > tuple_(*after),
+            models.Task.due_date > now,
+            models.Task.due_date <= until,
+            models.Task.status != "DONE"
+        )
+        .order_by(models.Task.updated_at, models.Task.id)
+        .limit(limit)
+    )
+
+
+class ReminderScheduler:
+    """Background thread firing due-date reminders from a bounded timer heap"""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        kinds: Iterable[ReminderKind],
+        window: float,
+        max_timers: int,
+        scan_interval: float
+    ):
+        self.session_factory = session_factory
+        self.kinds = {kind.name: kind for kind in kinds}
+        self.window = timedelta(seconds=window)
+        self.max_timers = max_timers
+        self.scan_interval = scan_interval
+
+        self._timers: list[Timer] = []
+        self._pending: set[Timer] = set()
+        # kind -> position the scans have loaded up to
+        self._loaded: dict[str, Position] = {}
+        # (updated_at, id) position the next catch-up pass starts after
+        self._written: Optional[Position] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+
+    @property
+    def timer_count(self) -> int:
+        return len(self._timers)
+
+    def start(self) -> None:
+        """Start the scheduler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the scheduler thread; unfired timers are reloaded on the next start"""
+        if not self._thread:
+            return
+
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def load_watermarks(self, db: Session, now: Optional[datetime] = None) -> None:
+        """
+        Start the scans from the stored watermarks
+
+        A kind without a watermark starts at now, so enabling reminders
+        doesn't send one for every task that is already overdue.
+        """
+        now = now or datetime.now(timezone.utc)
+        db.execute(
+            insert(models.ReminderWatermark)
+            .values([{"kind": name, "due_date": now, "task_id": MAX_ID} for name in self.kinds])
+            .on_conflict_do_nothing(index_elements=["kind"])
+        )
+        db.commit()
+
+        watermarks = db.scalars(
+            select(models.ReminderWatermark).where(models.ReminderWatermark.kind.in_(self.kinds))
+        ).all()
+        with self._lock:
+            self._timers.clear()
+            self._pending.clear()
+            self._loaded = {watermark.kind: (watermark.due_date, watermark.task_id) for watermark in watermarks}
+            self._written = (now - self.window, MIN_ID)
+
+    def scan(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Load the timers firing within the window, as far as the heap has room
+
+        Returns:
+            Number of timers added
+        """
+        now = now or datetime.now(timezone.utc)
+        added = 0
+
+        for kind in self.kinds.values():
+            room = self.max_timers - len(self._timers)
+            if room <= 0:
+                break
+
+            until = now + kind.lead + self.window
+            rows = db.execute(build_due_scan(self._loaded[kind.name], until, room)).all()
+            with self._lock:
+                for row in rows:
+                    added += self._push(Timer(row.due_date - kind.lead, row.due_date, row.id, kind.name))
+                # A full batch may have stopped short of until
+                self._loaded[kind.name] = (
+                    (rows[-1].due_date, rows[-1].id) if len(rows) == room else (until, MAX_ID)
+                )
+
+        return added + self._catch_up(db, now)
+
+    def _catch_up(self, db: Session, now: datetime) -> int:
+        """Load the timers of tasks written since the previous scan behind the scan positions"""
+        # Each task may add a timer per kind
+        room = (self.max_timers - len(self._timers)) // len(self.kinds)
+        if room <= 0:
+            return 0
+
+        until = max(self._loaded.values())[0]
+        rows = db.execute(build_catch_up_scan(self._written, now, until, room)).all()
+        with self._lock:
+            # Tasks seen before only re-fire as no-ops against reminders_sent
+            added = sum(self._schedule(row.id, row.due_date) for row in rows)
+            # A full batch resumes after its last write, the rest from this scan
+            self._written = (
+                (rows[-1].updated_at, rows[-1].id) if len(rows) == room else (now - CATCH_UP_OVERLAP, MIN_ID)
+            )
+        return added
+
+    def schedule(self, tasks: Iterable) -> None:
+        """
+        Add timers for tasks this process created or rescheduled into the loaded window
+
+        Timers that don't fit in the heap are dropped; the catch-up pass of a
+        later scan loads them once there is room.
+        """
+        added = 0
+
+        with self._lock:
+            for task in tasks:
+                if task.due_date is not None and task.status != "DONE":
+                    added += self._schedule(task.id, task.due_date)
+
+        if added:
+            self._wakeup.set()
+
+    def _schedule(self, task_id: uuid.UUID, due_date: datetime) -> int:
+        """Add the timers of a task behind the scan positions (caller holds the lock)"""
+        added = 0
+        for kind in self.kinds.values():
+            loaded = self._loaded.get(kind.name)
+            # Positions past loaded are left to the scans
+            if loaded and (due_date, task_id) <= loaded:
+                added += self._push(Timer(due_date - kind.lead, due_date, task_id, kind.name))
+        return added
+
+    def fire_due(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Stage the reminders of every timer due by now and advance the watermarks
+
+        Returns:
+            Number of reminders staged
+        """
+        now = now or datetime.now(timezone.utc)
+        due: dict[str, list[Timer]] = {}
+
+        with self._lock:
+            while self._timers and self._timers[0].fire_at <= now:
+                timer = heapq.heappop(self._timers)
+                self._pending.discard(timer)
+                due.setdefault(timer.kind, []).append(timer)
+
+        if not due:
+            return 0
+
+        staged = 0
+        for name, timers in due.items():
+            tasks = {
+                task.id: task
+                for task in db.execute(
+                    select(models.Task.id, models.Task.title, models.Task.due_date, models.Task.creator_email)
+                    .where(models.Task.id.in_({timer.task_id for timer in timers}), models.Task.status != "DONE")
+                )
+            }
+            # Completed, deleted or rescheduled since the timer was loaded
+            unsent = [
+                tasks[timer.task_id] for timer in timers
+                if timer.task_id in tasks and tasks[timer.task_id].due_date == timer.due_date
+            ]
+
+            if unsent:
+                # Another replica may have sent some of them already
+                sent = set(db.scalars(
+                    insert(models.ReminderSent)
+                    .values([{"task_id": task.id, "kind": name, "due_date": task.due_date} for task in unsent])
+                    .on_conflict_do_nothing()
+                    .returning(models.ReminderSent.task_id)
+                ))
+                for task in unsent:
+                    if task.id not in sent:
+                        continue
+                    add_outbox_message(
+                        db,
+                        notification_type=name,
+                        data={
+                            "task_id": str(task.id),
+                            "task_title": task.title,
+                            "due_date": task.due_date.isoformat(),
+                            "user_email": task.creator_email
+                        }
+                    )
+                    staged += 1
+
+            fired = max((timer.due_date, timer.task_id) for timer in timers)
+            db.execute(
+                update(models.ReminderWatermark)
+                .where(
+                    models.ReminderWatermark.kind == name,
+                    tuple_(models.ReminderWatermark.due_date, models.ReminderWatermark.task_id) < tuple_(*fired)
+                )
+                .values(due_date=fired[0], task_id=fired[1])
+            )
+
+        db.commit()
+        if staged:
+            reminders_sent.inc(staged)
+            outbox_relay.notify()
+        return staged
+
+    def prune_sent(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Delete reminders_sent rows more than SENT_RETENTION past their due date
+
+        Returns:
+            Number of rows deleted
+        """
+        now = now or datetime.now(timezone.utc)
+        deleted = db.execute(
+            delete(models.ReminderSent).where(models.ReminderSent.due_date < now - SENT_RETENTION)
+        ).rowcount
+        db.commit()
+        return deleted
+
+    def _push(self, timer: Timer) -> int:
+        """Add a timer unless it is already pending or the heap is full (caller holds the lock)"""
+        if timer in self._pending or len(self._timers) >= self.max_timers:
+            return 0
+        self._pending.add(timer)
+        heapq.heappush(self._timers, timer)
+        return 1
+
+    def _seconds_until_next_timer(self) -> Optional[float]:
+        with self._lock:
+            if not self._timers:
+                return None
+            return (self._timers[0].fire_at - datetime.now(timezone.utc)).total_seconds()
+
+    def _run(self) -> None:
+        loaded = False
+        next_scan = 0.0
+
+        while not self._stopping.is_set():
+            try:
+                with self.session_factory() as db:
+                    if not loaded:
+                        self.load_watermarks(db)
+                        loaded = True
+                    if time.monotonic() >= next_scan:
+                        self.scan(db)
+                        self.prune_sent(db)
+                        next_scan = time.monotonic() + self.scan_interval
+                    self.fire_due(db)
+            except Exception as e:
+                logger.error(f"Reminder scheduling failed: {e}")
+                # Reload: timers popped by a failed fire_due are past the watermark
+                loaded = False
+                next_scan = 0.0
+
+            timeout = max(next_scan - time.monotonic(), 0.0)
+            until_timer = self._seconds_until_next_timer()
+            if until_timer is not None:
+                timeout = min(timeout, max(until_timer, 0.0))
+            self._wakeup.wait(timeout if loaded else self.scan_interval)
+            self._wakeup.clear()
+
+
+reminder_scheduler = ReminderScheduler(
+    session_factory=SessionLocal,
+    kinds=KINDS,
+    window=settings.REMINDER_WINDOW_SECONDS,
+    max_timers=settings.REMINDER_MAX_TIMERS,
+    scan_interval=settings.REMINDER_SCAN_INTERVAL
+)
@@ -2,11 +2,14 @@
 Pydantic schemas for request/response validation
 Defines the API contract
 """
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from datetime import datetime
-from typing import Optional, Literal
+from typing import Dict, List, Optional, Literal
+from config import get_settings
 import uuid
 
+settings = get_settings()
+
 
 # ============================================
 # Task Schemas
@@ -41,12 +44,101 @@ class TaskResponse(TaskBase):
     """Schema for task response"""
     id: uuid.UUID
     created_by: uuid.UUID
+    comment_count: int = 0
     created_at: datetime
     updated_at: datetime
     
     model_config = ConfigDict(from_attributes=True)
 
 
+class TaskPage(BaseModel):
+    """Schema for one page of tasks"""
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+class AssigneeCount(BaseModel):
+    """Number of tasks assigned to one user (None: unassigned)"""
+    assigned_to: Optional[uuid.UUID] = None
+    count: int
+
+
+class TaskStats(BaseModel):
+    """Schema for task counts by status, priority and assignee"""
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_assignee: List[AssigneeCount]
+
+
+class TaskTombstone(BaseModel):
+    """A task that left the task list (reason: deleted or archived)"""
+    id: uuid.UUID
+    deleted_at: datetime
+    reason: str
+
+
+class TaskChanges(BaseModel):
+    """Schema for one page of the task change feed"""
+    items: List[TaskResponse]
+    deleted: List[TaskTombstone]
+    next_cursor: str
+    has_more: bool
+
+
+# ============================================
+# Batch Task Schemas
+# ============================================
+
+def _reject_duplicate_ids(ids: List[uuid.UUID]) -> None:
+    if len(set(ids)) != len(ids):
+        raise ValueError("Duplicate task ids in batch")
+
+
+class TaskBatchCreate(BaseModel):
+    """Schema for creating many tasks at once"""
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=settings.BATCH_MAX_ITEMS)
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    """Schema for one item of a batch update: the task id plus fields to change"""
+    id: uuid.UUID
+
+
+class TaskBatchUpdate(BaseModel):
+    """Schema for updating many tasks at once"""
+    items: List[TaskBatchUpdateItem] = Field(..., min_length=1, max_length=settings.BATCH_MAX_ITEMS)
+
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, items: List[TaskBatchUpdateItem]) -> List[TaskBatchUpdateItem]:
+        _reject_duplicate_ids([item.id for item in items])
+        return items
+
+
+class TaskBatchDelete(BaseModel):
+    """Schema for deleting many tasks at once"""
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=settings.BATCH_MAX_ITEMS)
+
+    @field_validator("ids")
+    @classmethod
+    def unique_ids(cls, ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        _reject_duplicate_ids(ids)
+        return ids
+
+
+class TaskBatchResult(BaseModel):
+    """Outcome of one batch item"""
+    id: uuid.UUID
+    status: Literal["created", "updated", "deleted", "not_found"]
+    task: Optional[TaskResponse] = None
+
+
+class TaskBatchResponse(BaseModel):
+    """Schema for batch response, one result per item in request order"""
+    results: List[TaskBatchResult]
+
+
 # ============================================
 # Comment Schemas
 # ============================================
@@ -67,6 +159,12 @@ class CommentResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CommentPage(BaseModel):
+    """Schema for one page of comments"""
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None
+
+
 # ============================================
 # Standard Response Schemas
 # ============================================
@@ -0,0 +1,54 @@
+"""
+Full-text search over task title and description
+
+tasks.search_vector is a generated tsvector column (title weighted A,
+description B) behind the GIN index ix_tasks_search_vector. Results are
+ordered by ts_rank, then newest first, with keyset pagination on
+(rank, created_at, id).
+
+Latency target: p95 under 100 ms per page at 10M tasks for queries whose
+terms match up to ~10k tasks. The GIN index finds the matches, but every
+match is ranked before the top page is cut, so very common terms cost
+time proportional to their match count; stop words are dropped by the
+'english' configuration and never reach the index.
+"""
+from sqlalchemy import REAL, cast, func, literal_column, select, tuple_
+from datetime import datetime
+from typing import Optional
+import uuid
+import models
+
+# Text search configuration; must match models.Task.search_vector
+SEARCH_CONFIG = "english"
+
+
+def build_search_query(
+    q: str,
+    limit: int,
+    after: Optional[tuple[float, datetime, uuid.UUID]] = None
+):
+    """
+    Select (Task, rank) rows matching q, best first, LIMIT limit + 1
+
+    q uses websearch syntax: quoted phrases, OR, and -excluded terms.
+    """
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    rank = func.ts_rank(models.Task.search_vector, tsquery).label("rank")
+
+    query = (
+        select(models.Task, rank)
+        .where(models.Task.search_vector.op("@@")(tsquery))
+    )
+
+    if after:
+        after_rank, created_at, task_id = after
+        # Compare as REAL, the type ts_rank returns, so the cursor row itself is excluded
+        query = query.where(
+            tuple_(rank, models.Task.created_at, models.Task.id)
+            < tuple_(cast(after_rank, REAL), created_at, task_id)
+        )
+
+    return (
+        query.order_by(rank.desc(), models.Task.created_at.desc(), models.Task.id.desc())
+        .limit(limit + 1)
+    )
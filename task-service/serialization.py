@@ -0,0 +1,33 @@
+"""
+Fast JSON path for task and comment responses
+
+Row tuples selected column by column are zipped with their field names
+and encoded by orjson, skipping the ORM entity, pydantic validation and
+FastAPI's response_model re-encoding. OPT_UTC_Z makes UTC datetimes end
+in "Z" like pydantic's, so both paths produce the same JSON.
+See tests/test_serialization.py for the rows/sec comparison.
+"""
+
+from fastapi import Response
+from typing import Any, Iterable, Optional, Sequence
+import orjson
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode dicts/lists of JSON types, UUIDs and datetimes"""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def row_dicts(rows: Iterable[Sequence], fields: Sequence[str]) -> list[dict]:
+    """
+    Map row tuples to dicts of their leading fields
+
+    Rows must be selected with `fields` as their first columns; any
+    trailing columns (kept for cursors or ETags) are dropped.
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def json_response(content: Any, headers: Optional[dict] = None) -> Response:
+    """application/json response from already JSON-ready content"""
+    return Response(content=encode_json(content), media_type="application/json", headers=headers)
@@ -0,0 +1,210 @@
+"""
+Incrementally maintained task counters behind GET /tasks/stats
+
+task_stats holds one row per (dimension, value), e.g. ("status", "TODO").
+Every write to tasks applies its +1/-1 deltas to those rows in the same
+transaction, so reading the stats costs O(groups) instead of O(tasks).
+A background reconciler periodically recounts from tasks to fix any drift
+(e.g. rows changed by hand in psql).
+"""
+
+from sqlalchemy import String, and_, cast, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, sessionmaker
+from collections import Counter
+from typing import Iterable, Optional
+import logging
+import threading
+import models
+from config import get_settings
+from database import SessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Task columns that are counted; the dimension name is the column name
+DIMENSIONS = ("status", "priority", "assigned_to")
+
+# Stored value for tasks without an assignee
+UNASSIGNED = ""
+
+# pg_try_advisory_xact_lock key: one reconciliation at a time across instances
+RECONCILE_LOCK_KEY = 7_420_002
+
+
+def _group_values(task) -> list[tuple[str, str]]:
+    """(dimension, value) groups a task (ORM object or row) counts towards"""
+    groups = []
+    for dimension in DIMENSIONS:
+        value = getattr(task, dimension)
+        groups.append((dimension, UNASSIGNED if value is None else str(value)))
+    return groups
+
+
+def task_deltas(before: Iterable = (), after: Iterable = ()) -> Counter:
+    """
+    Counter deltas for tasks going from `before` to `after`
+
+    Pass only `after` for created tasks, only `before` for deleted ones,
+    and both (in the same order) for updates.
+    """
+    deltas = Counter()
+    for task in before:
+        for group in _group_values(task):
+            deltas[group] -= 1
+    for task in after:
+        for group in _group_values(task):
+            deltas[group] += 1
+    return deltas
+
+
+def build_stats_upsert(deltas: Counter):
+    """One INSERT ... ON CONFLICT DO UPDATE applying every non-zero delta, or None"""
+    rows = [
+        {"dimension": dimension, "value": value, "count": delta}
+        for (dimension, value), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return None
+
+    # Sorted rows lock counters in a fixed order, so concurrent writers can't deadlock
+    statement = insert(models.TaskStat).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[models.TaskStat.dimension, models.TaskStat.value],
+        set_={"count": models.TaskStat.count + statement.excluded.count}
+    )
+
+
+async def apply_task_deltas(db, deltas: Counter) -> None:
+    """Apply counter deltas in the caller's transaction"""
+    statement = build_stats_upsert(deltas)
+    if statement is not None:
+        await db.execute(statement)
+
+
+async def read_stats(db) -> dict:
+    """Current counters as a TaskStats payload"""
+    rows = await db.execute(
+        select(models.TaskStat.dimension, models.TaskStat.value, models.TaskStat.count)
+        .where(models.TaskStat.count > 0)
+        .order_by(models.TaskStat.dimension, models.TaskStat.value)
+    )
+
+    stats = {"total": 0, "by_status": {}, "by_priority": {}, "by_assignee": []}
+    for dimension, value, count in rows.all():
+        if dimension == "status":
+            stats["by_status"][value] = count
+            stats["total"] += count
+        elif dimension == "priority":
+            stats["by_priority"][value] = count
+        elif dimension == "assigned_to":
+            stats["by_assignee"].append({"assigned_to": value or None, "count": count})
+
+    return stats
+
+
+def build_drift_query():
+    """
+    (dimension, value, drift) for every group whose counter differs from a recount
+
+    A single statement reads tasks and task_stats from one snapshot, and
+    writers change both in the same transaction, so without any table lock
+    the drift is exactly what the committed counters are missing.
+    """
+    actual = union_all(*[
+        select(
+            literal(dimension).label("dimension"),
+            func.coalesce(cast(getattr(models.Task, dimension), String), UNASSIGNED).label("value"),
+            func.count().label("count")
+        ).group_by(getattr(models.Task, dimension))
+        for dimension in DIMENSIONS
+    ]).subquery("actual")
+    stored = models.TaskStat.__table__
+
+    drift = func.coalesce(actual.c.count, 0) - func.coalesce(stored.c.count, 0)
+    return (
+        select(
+            func.coalesce(actual.c.dimension, stored.c.dimension),
+            func.coalesce(actual.c.value, stored.c.value),
+            drift
+        )
+        .select_from(actual.join(
+            stored,
+            and_(stored.c.dimension == actual.c.dimension, stored.c.value == actual.c.value),
+            full=True
+        ))
+        .where(drift != 0)
+    )
+
+
+def reconcile_stats(db: Session) -> int:
+    """
+    Recount task_stats from tasks and correct any drift
+
+    Takes no table lock, writers keep going: the drift comes from one
+    consistent snapshot and is applied as +/- deltas, which add up with
+    whatever writers committed since. An advisory lock lets one instance
+    reconcile at a time; the others skip the pass.
+
+    Returns:
+        Number of (dimension, value) groups that were corrected
+        (0 when another instance is reconciling)
+    """
+    locked = db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RECONCILE_LOCK_KEY})
+    if not locked:
+        return 0
+
+    drift = Counter({(dimension, value): delta for dimension, value, delta in db.execute(build_drift_query())})
+
+    statement = build_stats_upsert(drift)
+    if statement is not None:
+        db.execute(statement)
+        logger.warning(f"Corrected task_stats drift in {len(drift)} groups: {dict(drift)}")
+    db.execute(models.TaskStat.__table__.delete().where(models.TaskStat.count == 0))
+    db.commit()
+
+    return len(drift)
+
+
+class StatsReconciler:
+    """Background thread running reconcile_stats every interval seconds"""
+
+    def __init__(self, session_factory: sessionmaker, interval: float):
+        self.session_factory = session_factory
+        self.interval = interval
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start the reconciler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the reconciler thread"""
+        if not self._thread:
+            return
+
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                with self.session_factory() as db:
+                    reconcile_stats(db)
+            except Exception as e:
+                logger.error(f"Task stats reconciliation failed: {e}")
+
+
+stats_reconciler = StatsReconciler(
+    session_factory=SessionLocal,
+    interval=settings.STATS_RECONCILE_INTERVAL
+)
@@ -0,0 +1,98 @@
+"""
+Tests for archiving completed tasks and ?include_archived
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+import models
+from archive import archive_cutoff, archive_tasks
+
+
+def _age(db, *task_ids, days: int = 365):
+    """Backdate tasks' updated_at so they are due for archiving"""
+    db.execute(
+        update(models.Task)
+        .where(models.Task.id.in_(task_ids))
+        .values(updated_at=datetime.now(timezone.utc) - timedelta(days=days))
+    )
+
+
+def test_archive_moves_old_done_tasks_with_comments(client, auth_headers, db):
+    """Test only old DONE tasks move, in batches, taking their comments and leaving the stats"""
+    old_done = [
+        client.post("/tasks", json={"title": f"Old done {i}", "status": "DONE"}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+    client.post("/tasks", json={"title": "Recent done", "status": "DONE"}, headers=auth_headers)
+    old_todo = client.post("/tasks", json={"title": "Old todo"}, headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{old_done[0]}/comments", json={"content": "Shipped"}, headers=auth_headers)
+    _age(db, *old_done, old_todo)
+
+    archived = archive_tasks(db, archive_cutoff(90), batch_size=2)
+
+    assert archived == 3
+    assert set(db.scalars(select(models.Task.title))) == {"Recent done", "Old todo"}
+    assert {str(task_id) for task_id in db.scalars(select(models.ArchivedTask.id))} == set(old_done)
+    assert db.scalars(select(models.Comment)).all() == []
+    assert db.scalar(select(models.ArchivedComment.content)) == "Shipped"
+    assert set(db.scalars(select(models.TaskDeletion.reason))) == {"archived"}
+
+    stats = client.get("/tasks/stats", headers=auth_headers).json()
+    assert stats["total"] == 2
+    assert stats["by_status"] == {"DONE": 1, "TODO": 1}
+
+
+def test_archived_tasks_need_include_archived(client, auth_headers, db):
+    """Test the normal endpoints see the hot set only and include_archived reaches the archive"""
+    task_id = client.post("/tasks", json={"title": "Finished", "status": "DONE"}, headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{task_id}/comments", json={"content": "Done and dusted"}, headers=auth_headers)
+    client.post("/tasks", json={"title": "Live"}, headers=auth_headers)
+    _age(db, task_id)
+    archive_tasks(db, archive_cutoff(90))
+
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 404
+    assert client.get(f"/tasks/{task_id}/comments", headers=auth_headers).status_code == 404
+    assert [task["title"] for task in client.get("/tasks", headers=auth_headers).json()["items"]] == ["Live"]
+
+    task = client.get(f"/tasks/{task_id}?include_archived=true", headers=auth_headers)
+    assert task.status_code == 200
+    assert task.json()["title"] == "Finished" and task.json()["comment_count"] == 1
+    sparse = client.get(f"/tasks/{task_id}?include_archived=true&fields=title", headers=auth_headers)
+    assert sparse.json() == {"title": "Finished"}
+
+    comments = client.get(f"/tasks/{task_id}/comments?include_archived=true", headers=auth_headers).json()
+    assert [comment["content"] for comment in comments["items"]] == ["Done and dusted"]
+
+    listed = client.get("/tasks?include_archived=true", headers=auth_headers).json()["items"]
+    assert [task["title"] for task in listed] == ["Live", "Finished"]
+
+    exported = client.get("/tasks/export?include_archived=true", headers=auth_headers).text.splitlines()
+    assert [json.loads(line)["title"] for line in exported] == ["Live", "Finished"]
+
+    # Archived tasks are read-only
+    assert client.put(f"/tasks/{task_id}", json={"title": "Again"}, headers=auth_headers).status_code == 404
+
+
+def test_include_archived_pages_across_both_tables(client, auth_headers, db):
+    """Test keyset pagination walks hot and archived tasks in one newest-first order"""
+    ids = [
+        client.post("/tasks", json={"title": f"Task {i}", "status": "DONE" if i % 2 else "TODO"}, headers=auth_headers).json()["id"]
+        for i in range(5)
+    ]
+    _age(db, *ids)
+    archive_tasks(db, archive_cutoff(90))
+
+    seen = []
+    cursor = None
+    for _ in range(5):
+        url = "/tasks?include_archived=true&limit=2&fields=id" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url, headers=auth_headers).json()
+        seen += [task["id"] for task in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == ids[::-1]
@@ -0,0 +1,109 @@
+"""
+Tests for the asyncpg-backed session mode (DATABASE_ASYNC)
+Runs the task and comment endpoints on a real AsyncSession.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from tests.conftest import TEST_DATABASE_URL, TEST_USER_ID, engine
+from database import Base, get_db, get_read_db, get_read_session_scope, get_session_scope
+from dependencies import get_current_user_id
+from main import app
+
+pytest.importorskip("asyncpg")
+
+
+@pytest.fixture
+def async_client():
+    """Test client whose endpoints get an AsyncSession"""
+    # NullPool: every TestClient request runs on a fresh event loop
+    async_engine = create_async_engine(
+        TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+        poolclass=NullPool
+    )
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def get_test_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_read_db] = get_test_db
+    app.dependency_overrides[get_session_scope] = lambda: AsyncTestingSessionLocal.begin
+    app.dependency_overrides[get_read_session_scope] = lambda: AsyncTestingSessionLocal.begin
+    app.dependency_overrides[get_current_user_id] = lambda: TEST_USER_ID
+
+    yield TestClient(app)
+
+    app.dependency_overrides.clear()
+    asyncio.run(async_engine.dispose())
+
+    # These requests really committed; leave the tables empty for other tests
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+def test_task_lifecycle_async(async_client):
+    """Test create, read, update, comment and delete on an AsyncSession"""
+    headers = {"X-User-Email": "test@example.com"}
+
+    response = async_client.post("/tasks", json={"title": "Async Task"}, headers=headers)
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    response = async_client.get(f"/tasks/{task_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Async Task"
+
+    response = async_client.put(f"/tasks/{task_id}", json={"status": "DONE"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "DONE"
+
+    response = async_client.post(f"/tasks/{task_id}/comments", json={"content": "Async comment"}, headers=headers)
+    assert response.status_code == 201
+
+    response = async_client.get(f"/tasks/{task_id}/comments", headers=headers)
+    assert response.status_code == 200
+    assert [comment["content"] for comment in response.json()["items"]] == ["Async comment"]
+
+    response = async_client.get("/tasks", params={"status_filter": "DONE"}, headers=headers)
+    assert response.status_code == 200
+    assert task_id in [task["id"] for task in response.json()["items"]]
+
+    response = async_client.get("/tasks/search", params={"q": "async"}, headers=headers)
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()["items"]] == [task_id]
+
+    response = async_client.get("/tasks/export", headers=headers)
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [task_id]
+
+    response = async_client.patch("/tasks:batch", json={"items": [{"id": task_id, "due_date": None, "title": "Batched"}]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["task"]["title"] == "Batched"
+
+    response = async_client.delete(f"/tasks/{task_id}", headers=headers)
+    assert response.status_code == 204
+
+    response = async_client.get(f"/tasks/{task_id}", headers=headers)
+    assert response.status_code == 404
+
+
+def test_batch_endpoints_async(async_client):
+    """Test the set-based batch statements on asyncpg"""
+    headers = {"X-User-Email": "test@example.com"}
+
+    response = async_client.post("/tasks:batch", json={"items": [{"title": "A"}, {"title": "B"}]}, headers=headers)
+    assert response.status_code == 201
+    ids = [result["id"] for result in response.json()["results"]]
+
+    response = async_client.request("DELETE", "/tasks:batch", json={"ids": ids}, headers=headers)
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == ["deleted", "deleted"]
@@ -0,0 +1,106 @@
+"""
+Tests for the read-through task cache
+Uses an in-memory stand-in for the Redis client.
+"""
+
+import pytest
+
+from cache import cache_hits, cache_misses, task_cache
+
+
+class FakeRedis:
+    """Dict-backed subset of the redis.asyncio client"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def fake_redis():
+    """Point the task cache at a fresh FakeRedis"""
+    fake = FakeRedis()
+    task_cache.client = fake
+    yield fake
+    task_cache.client = None
+
+
+def test_get_task_read_through(client, auth_headers, fake_redis):
+    """Test the first read fills the cache and the second is a hit"""
+    task_id = client.post("/tasks", json={"title": "Cached"}, headers=auth_headers).json()["id"]
+    hits, misses = cache_hits.value, cache_misses.value
+
+    first = client.get(f"/tasks/{task_id}", headers=auth_headers)
+    second = client.get(f"/tasks/{task_id}", headers=auth_headers)
+
+    assert first.json() == second.json()
+    assert f"task:{task_id}" in fake_redis.data
+    assert cache_misses.value == misses + 1
+    assert cache_hits.value == hits + 1
+
+
+def test_update_rewrites_cache(client, auth_headers, fake_redis):
+    """Test an update replaces the cached payload"""
+    task_id = client.post("/tasks", json={"title": "Before"}, headers=auth_headers).json()["id"]
+    client.get(f"/tasks/{task_id}", headers=auth_headers)
+
+    client.put(f"/tasks/{task_id}", json={"title": "After"}, headers=auth_headers)
+
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == "After"
+
+
+def test_cache_hit_answers_if_none_match(client, auth_headers, fake_redis):
+    """Test a cached task revalidates to 304 with the ETag stored beside it"""
+    task_id = client.post("/tasks", json={"title": "Cached Tag"}, headers=auth_headers).json()["id"]
+    etag = client.get(f"/tasks/{task_id}", headers=auth_headers).headers["ETag"]
+    hits = cache_hits.value
+
+    response = client.get(f"/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert cache_hits.value == hits + 1
+    assert fake_redis.data[f"task:{task_id}"].startswith(etag.encode() + b"\n")
+
+
+def test_comment_and_delete_invalidate_cache(client, auth_headers, fake_redis):
+    """Test adding a comment and deleting the task drop the cached entry"""
+    task_id = client.post("/tasks", json={"title": "Invalidate"}, headers=auth_headers).json()["id"]
+    client.get(f"/tasks/{task_id}", headers=auth_headers)
+
+    client.post(f"/tasks/{task_id}/comments", json={"content": "Hi"}, headers=auth_headers)
+    assert f"task:{task_id}" not in fake_redis.data
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["comment_count"] == 1
+
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    assert f"task:{task_id}" not in fake_redis.data
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 404
+
+
+def test_metrics_expose_cache_counters(client):
+    """Test hit/miss counters are on /metrics"""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "task_cache_hits_total" in response.text
+    assert "task_cache_misses_total" in response.text
+
+
+def test_projection_served_from_cache(client, auth_headers, fake_redis):
+    """Test ?fields= on a cached task is projected from the cached payload"""
+    task_id = client.post("/tasks", json={"title": "Cached Sparse"}, headers=auth_headers).json()["id"]
+    full = client.get(f"/tasks/{task_id}", headers=auth_headers).json()
+    hits = cache_hits.value
+
+    response = client.get(f"/tasks/{task_id}?fields=id,updated_at", headers=auth_headers)
+
+    assert cache_hits.value == hits + 1
+    assert response.json() == {"id": task_id, "updated_at": full["updated_at"]}
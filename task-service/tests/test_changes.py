@@ -0,0 +1,91 @@
+"""
+Tests for the GET /tasks/changes sync feed
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import models
+from changes import NIL_ID, START, build_deletion_log, encode_changes_cursor, settings as changes_settings
+
+
+@pytest.fixture(autouse=True)
+def no_settle_time(monkeypatch):
+    """Return changes immediately instead of holding back the last seconds"""
+    monkeypatch.setattr(changes_settings, "CHANGES_SETTLE_SECONDS", 0)
+
+
+def _changes(client, auth_headers, since=None, limit=None):
+    params = {key: value for key, value in {"since": since, "limit": limit}.items() if value is not None}
+    response = client.get("/tasks/changes", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_since_cursor(client, auth_headers):
+    """Test a sync returns only tasks changed since the cursor plus tombstones"""
+    ids = [
+        client.post("/tasks", json={"title": f"Task {i}"}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+    first = _changes(client, auth_headers)
+    assert [task["id"] for task in first["items"]] == ids
+    assert first["deleted"] == [] and not first["has_more"]
+
+    client.put(f"/tasks/{ids[0]}", json={"status": "DONE"}, headers=auth_headers)
+    client.delete(f"/tasks/{ids[1]}", headers=auth_headers)
+    created = client.post("/tasks", json={"title": "Task 3"}, headers=auth_headers).json()["id"]
+
+    second = _changes(client, auth_headers, since=first["next_cursor"])
+    assert [task["id"] for task in second["items"]] == [ids[0], created]
+    assert second["items"][0]["status"] == "DONE"
+    assert [(tombstone["id"], tombstone["reason"]) for tombstone in second["deleted"]] == [(ids[1], "deleted")]
+
+    third = _changes(client, auth_headers, since=second["next_cursor"])
+    assert third["items"] == [] and third["deleted"] == []
+
+
+def test_changes_pages_with_has_more(client, auth_headers):
+    """Test a large backlog comes in limit-sized pages until has_more is false"""
+    ids = [
+        client.post("/tasks", json={"title": f"Task {i}"}, headers=auth_headers).json()["id"]
+        for i in range(5)
+    ]
+    baseline = _changes(client, auth_headers)["next_cursor"]
+    client.request("DELETE", "/tasks:batch", json={"ids": ids[:3]}, headers=auth_headers)
+
+    seen, deleted, cursor = [], [], None
+    for _ in range(5):
+        page = _changes(client, auth_headers, since=cursor or baseline, limit=2)
+        seen += [task["id"] for task in page["items"]]
+        deleted += [tombstone["id"] for tombstone in page["deleted"]]
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+
+    assert seen == []
+    assert sorted(deleted) == sorted(ids[:3])
+
+
+def test_changes_rejects_bad_and_expired_cursors(client, auth_headers):
+    """Test a malformed cursor is a 400 and one older than the tombstone retention a 410"""
+    expired = encode_changes_cursor(START, (datetime.now(timezone.utc) - timedelta(days=365), NIL_ID))
+
+    assert client.get("/tasks/changes?since=garbage", headers=auth_headers).status_code == 400
+    assert client.get(f"/tasks/changes?since={expired}", headers=auth_headers).status_code == 410
+
+
+def test_deleting_an_id_again_moves_its_tombstone(client, auth_headers, db):
+    """Test a second tombstone for the same id replaces the first instead of conflicting"""
+    task_id = client.post("/tasks", json={"title": "Twice"}, headers=auth_headers).json()["id"]
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    first = db.get(models.TaskDeletion, uuid.UUID(task_id))
+    first_deleted_at = first.deleted_at
+
+    db.execute(build_deletion_log([uuid.UUID(task_id)], reason="archived"))
+    db.refresh(first)
+
+    assert first.reason == "archived"
+    assert first.deleted_at > first_deleted_at
@@ -0,0 +1,107 @@
+"""
+Tests for the SSE fan-out hub and GET /tasks/stream
+"""
+
+import asyncio
+import json
+import uuid
+
+import main
+from hub import KEEPALIVE_FRAME, RESYNC_FRAME, TaskEventHub
+
+
+def _events(frames: list[str]) -> list[tuple[str, dict]]:
+    """(event type, data) of every non keep-alive frame"""
+    events = []
+    for frame in frames:
+        if frame == KEEPALIVE_FRAME:
+            continue
+        lines = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _drain(stream, count: int) -> list[str]:
+    return [await stream.__anext__() for _ in range(count)]
+
+
+def test_hub_filters_events_by_view():
+    """Test subscribers only get events in their view, and task_removed when a task leaves it"""
+    async def run():
+        hub = TaskEventHub(queue_size=10, max_subscribers=10, keepalive_interval=60)
+        todo = hub.frames({"status_filter": "TODO"})
+        everything = hub.frames({})
+        await todo.__anext__()
+        await everything.__anext__()
+
+        task_id = uuid.uuid4()
+        hub.publish("task_created", task_id, json.dumps({"id": str(task_id)}), {"status": "TODO"})
+        hub.publish(
+            "task_updated", task_id, json.dumps({"id": str(task_id)}),
+            {"status": "DONE"}, previous={"status": "TODO"}
+        )
+        hub.publish("task_created", task_id, json.dumps({"id": str(task_id)}), {"status": "DONE"})
+
+        return await _drain(todo, 2), await _drain(everything, 3), hub.subscriber_count
+
+    todo, everything, subscribers = asyncio.run(run())
+
+    assert [event for event, _ in _events(todo)] == ["task_created", "task_removed"]
+    assert [event for event, _ in _events(everything)] == ["task_created", "task_updated", "task_created"]
+    assert subscribers == 2
+
+
+def test_lagging_subscriber_gets_resync():
+    """Test a subscriber that falls queue_size events behind is told to resync and dropped"""
+    async def run():
+        hub = TaskEventHub(queue_size=2, max_subscribers=10, keepalive_interval=60)
+        stream = hub.frames({})
+        await stream.__anext__()
+
+        for _ in range(3):
+            task_id = uuid.uuid4()
+            hub.publish("task_created", task_id, json.dumps({"id": str(task_id)}), {})
+
+        frames = [frame async for frame in stream]
+        return frames, hub.subscriber_count
+
+    frames, subscribers = asyncio.run(run())
+
+    assert len(frames) == 3 and frames[-1] == RESYNC_FRAME
+    assert subscribers == 0
+
+
+class RecordingHub:
+    """Stands in for task_events and records what the endpoints publish"""
+
+    def __init__(self):
+        self.events = []
+
+    def tasks_created(self, tasks):
+        self.events += [("created", str(task.id)) for task in tasks]
+
+    def task_updated(self, task, previous=None):
+        self.events.append(("updated", str(task.id), previous.status if previous is not None else None))
+
+    def tasks_deleted(self, rows):
+        self.events += [("deleted", str(row.id)) for row in rows]
+
+
+def test_writes_publish_events(client, auth_headers, monkeypatch):
+    """Test task writes publish after they commit, updates with the old values"""
+    hub = RecordingHub()
+    monkeypatch.setattr(main, "task_events", hub)
+
+    task_id = client.post("/tasks", json={"title": "Live"}, headers=auth_headers).json()["id"]
+    client.put(f"/tasks/{task_id}", json={"status": "DONE"}, headers=auth_headers)
+    client.put(f"/tasks/{task_id}", json={}, headers=auth_headers)
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+
+    assert hub.events == [("created", task_id), ("updated", task_id, "TODO"), ("deleted", task_id)]
+
+
+def test_stream_rejects_when_full(client, auth_headers, monkeypatch):
+    """Test a process at SSE_MAX_SUBSCRIBERS answers 503 instead of opening another stream"""
+    monkeypatch.setattr(main, "task_events", TaskEventHub(queue_size=1, max_subscribers=0, keepalive_interval=60))
+
+    assert client.get("/tasks/stream", headers=auth_headers).status_code == 503
@@ -0,0 +1,60 @@
+"""
+Tests for trusted gateway mode (signed identity assertions)
+"""
+
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException, Request
+
+import dependencies
+from dependencies import get_current_user_email, get_current_user_id
+from identity import ASSERTION_HEADER, sign_identity, verify_identity
+
+SECRET = "internal-secret"
+
+
+def _request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_assertions_bind_identity_and_time():
+    """Test an assertion only verifies for its own user, email, secret and age"""
+    now = time.time()
+    assertion = sign_identity(SECRET, "user-1", "user@example.com", now=now)
+
+    assert verify_identity(SECRET, "user-1", "user@example.com", assertion, max_age=30, now=now + 10)
+    assert not verify_identity(SECRET, "user-2", "user@example.com", assertion, max_age=30, now=now)
+    assert not verify_identity(SECRET, "user-1", "admin@example.com", assertion, max_age=30, now=now)
+    assert not verify_identity("other-secret", "user-1", "user@example.com", assertion, max_age=30, now=now)
+    assert not verify_identity(SECRET, "user-1", "user@example.com", assertion, max_age=30, now=now + 31)
+    assert not verify_identity(SECRET, "user-1", "user@example.com", "garbage", max_age=30, now=now)
+
+
+def test_trusted_mode_skips_the_jwt(monkeypatch):
+    """Test signed gateway headers authenticate without a bearer token and spoofed ones are rejected"""
+    monkeypatch.setattr(dependencies.settings, "INTERNAL_AUTH_SECRET", SECRET)
+    user_id = uuid.uuid4()
+    headers = {
+        "X-User-ID": str(user_id),
+        "X-User-Email": "user@example.com",
+        ASSERTION_HEADER: sign_identity(SECRET, str(user_id), "user@example.com"),
+    }
+
+    request = _request(headers)
+    assert get_current_user_id(request, None) == user_id
+    assert get_current_user_email(request) == "user@example.com"
+
+    spoofed = [
+        {**headers, "X-User-Email": "admin@example.com"},
+        {**headers, "X-User-ID": str(uuid.uuid4())},
+        {"X-User-ID": str(user_id), "X-User-Email": "user@example.com"},
+    ]
+    for forged in spoofed:
+        with pytest.raises(HTTPException) as error:
+            get_current_user_id(_request(forged), None)
+        assert error.value.status_code == 401
@@ -0,0 +1,88 @@
+"""
+Tests for the COPY-based bulk importer
+"""
+
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+import models
+from database import SessionLocal
+from importer import import_tasks
+from reminders import KINDS, ReminderScheduler
+from tests.conftest import TEST_USER_ID
+
+
+def test_import_ndjson_in_chunks(db):
+    """Test valid rows load across several COPY chunks and bad rows are reported"""
+    lines = [json.dumps({"title": f"Imported {i}", "priority": "HIGH"}) for i in range(5)]
+    lines.insert(2, json.dumps({"title": "", "status": "DONE"}))
+    lines.insert(4, "{not json")
+    stream = io.StringIO("\n".join(lines) + "\n")
+
+    report = import_tasks(db, stream, "ndjson", created_by=TEST_USER_ID, chunk_size=2)
+
+    assert report.imported == 5
+    assert [line for line, _ in report.errors] == [3, 5]
+    assert "title" in report.errors[0][1]
+    tasks = db.scalars(select(models.Task)).all()
+    assert sorted(task.title for task in tasks) == [f"Imported {i}" for i in range(5)]
+    assert all(task.created_by == TEST_USER_ID and task.status == "TODO" for task in tasks)
+    assert db.get(models.TaskStat, ("priority", "HIGH")).count == 5
+
+
+def test_import_csv_special_characters(db):
+    """Test CSV values with tabs, newlines and backslashes survive COPY; empty cells are NULL"""
+    assignee = uuid.uuid4()
+    stream = io.StringIO(
+        "title,description,assigned_to,due_date\n"
+        f'"Tab\\there","Multi\nline \\\\ text",{assignee},2030-01-01T00:00:00+00:00\n'
+        "No description,,,\n"
+    )
+
+    report = import_tasks(db, stream, "csv", created_by=TEST_USER_ID)
+
+    assert report.imported == 2 and report.failed == 0
+    tasks = {task.title: task for task in db.scalars(select(models.Task))}
+    assert tasks["Tab\\there"].description == "Multi\nline \\\\ text"
+    assert tasks["Tab\\there"].assigned_to == assignee
+    assert tasks["No description"].description is None
+    assert tasks["No description"].assigned_to is None
+
+
+def test_import_stages_one_notification(db):
+    """Test an import stages a single summary notification, not one per task"""
+    stream = io.StringIO("".join(json.dumps({"title": f"Task {i}"}) + "\n" for i in range(3)))
+
+    import_tasks(db, stream, "ndjson", created_by=TEST_USER_ID, chunk_size=1, notify_email="me@example.com", source="old-tracker.ndjson")
+
+    messages = db.scalars(select(models.OutboxMessage)).all()
+    assert len(messages) == 1
+    assert messages[0].notification_type == "tasks_imported"
+    assert messages[0].payload == {
+        "user_email": "me@example.com",
+        "source": "old-tracker.ndjson",
+        "imported": 3,
+        "failed": 0
+    }
+
+
+def test_imported_tasks_get_reminders(db):
+    """Test a running scheduler reminds imported tasks due within the due-soon lead"""
+    now = datetime.now(timezone.utc)
+    scheduler = ReminderScheduler(SessionLocal, KINDS, window=3600, max_timers=100, scan_interval=60)
+    scheduler.load_watermarks(db, now)
+    scheduler.scan(db, now)
+    stream = io.StringIO(json.dumps({"title": "Imported", "due_date": (now + timedelta(hours=2)).isoformat()}) + "\n")
+
+    import_tasks(db, stream, "ndjson", created_by=TEST_USER_ID, notify_email="me@example.com")
+    scheduler.scan(db, now)
+
+    assert scheduler.fire_due(db, now) == 1
+    reminder = db.scalars(
+        select(models.OutboxMessage).where(models.OutboxMessage.notification_type == "task_due_soon")
+    ).one()
+    assert reminder.payload["user_email"] == "me@example.com"
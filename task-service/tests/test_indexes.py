@@ -0,0 +1,202 @@
+"""
+EXPLAIN-based index checks for task queries
+A new list_tasks filter can't land without an index behind it.
+"""
+
+import inspect
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+import main
+import models
+from migrations import apply_migrations
+from changes import START, build_changed_tasks_query
+from reminders import MAX_ID, MIN_ID, build_catch_up_scan, build_due_scan
+from search import build_search_query
+
+
+# Sample value and indexed column for every list_tasks filter.
+# Adding a filter to list_tasks without adding it here fails test_every_filter_is_covered.
+FILTER_SAMPLES = {
+    "status_filter": ("TODO", "status"),
+    "priority": ("HIGH", "priority"),
+    "assigned_to": (uuid.uuid4(), "assigned_to"),
+    "created_by": (uuid.uuid4(), "created_by"),
+    "due_before": (datetime(2030, 1, 1, tzinfo=timezone.utc), "due_date"),
+}
+
+# list_tasks parameters that are not filters
+NON_FILTER_PARAMS = {
+    "request", "response", "cursor", "limit", "fields", "include_archived", "current_user_id", "db"
+}
+
+
+def _leading_columns(table) -> dict[str, str]:
+    """Map index name to its leading column"""
+    return {index.name: index.expressions[0].name for index in table.indexes}
+
+
+def _plan_nodes(plan: dict):
+    """Walk every node of an EXPLAIN (FORMAT JSON) plan"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _explain(db, query) -> dict:
+    """Return the JSON plan for a select() with sequential scans disabled"""
+    compiled = query.compile(dialect=postgresql.dialect())
+    params = {key: str(value) for key, value in compiled.params.items()}
+
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    result = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    return result.scalar()[0]["Plan"]
+
+
+def test_every_filter_is_covered():
+    """Test every list_tasks filter has an entry in FILTER_SAMPLES"""
+    params = set(inspect.signature(main.list_tasks).parameters) - NON_FILTER_PARAMS
+
+    assert params == set(FILTER_SAMPLES)
+
+
+@pytest.mark.parametrize("param", sorted(FILTER_SAMPLES))
+def test_filter_uses_index(db, param):
+    """Test each list_tasks filter is served by an index led by its column"""
+    value, column = FILTER_SAMPLES[param]
+    query = (
+        main.apply_task_filters(select(models.Task), **{param: value})
+        .order_by(models.Task.created_at.desc(), models.Task.id.desc())
+        .limit(51)
+    )
+
+    nodes = list(_plan_nodes(_explain(db, query)))
+    leading = _leading_columns(models.Task.__table__)
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+    used = [node["Index Name"] for node in nodes if "Index Name" in node]
+    assert any(leading.get(name) == column for name in used), used
+
+
+@pytest.mark.parametrize("param", sorted(set(FILTER_SAMPLES) - {"status_filter"}))
+def test_archive_filter_uses_index(db, param):
+    """Test each list_tasks filter is also indexed on tasks_archive (?include_archived=true)"""
+    value, column = FILTER_SAMPLES[param]
+    query = (
+        main.apply_task_filters(select(models.ArchivedTask), model=models.ArchivedTask, **{param: value})
+        .order_by(models.ArchivedTask.created_at.desc(), models.ArchivedTask.id.desc())
+        .limit(51)
+    )
+
+    nodes = list(_plan_nodes(_explain(db, query)))
+    leading = _leading_columns(models.ArchivedTask.__table__)
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+    used = [node["Index Name"] for node in nodes if "Index Name" in node]
+    assert any(leading.get(name) == column for name in used), used
+
+
+def test_archive_status_filter_skips_the_archive(db):
+    """Test a status other than DONE reads nothing from tasks_archive, whose tasks are all DONE"""
+    query = main.apply_task_filters(
+        select(models.ArchivedTask), status_filter="TODO", model=models.ArchivedTask
+    ).limit(51)
+
+    nodes = list(_plan_nodes(_explain(db, query)))
+
+    assert any(node.get("One-Time Filter") == "false" for node in nodes)
+    assert not any("Scan" in node["Node Type"] for node in nodes)
+
+
+def test_comment_lookup_uses_index(db):
+    """Test loading a task's comments is served by the task_id index"""
+    query = (
+        select(models.Comment)
+        .where(models.Comment.task_id == uuid.uuid4())
+        .order_by(models.Comment.created_at)
+    )
+
+    nodes = list(_plan_nodes(_explain(db, query)))
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+    assert "ix_comments_task_id_created_at" in [node.get("Index Name") for node in nodes]
+
+
+def test_search_uses_gin_index(db):
+    """Test full-text search is served by the GIN index on search_vector"""
+    nodes = list(_plan_nodes(_explain(db, build_search_query("deploy", 50))))
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+    assert "ix_tasks_search_vector" in [node.get("Index Name") for node in nodes]
+
+
+def test_changes_use_updated_at_index(db):
+    """Test the change feed is served by the (updated_at, id) index"""
+    query = build_changed_tasks_query(START, datetime.now(timezone.utc), 200)
+
+    nodes = list(_plan_nodes(_explain(db, query)))
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+    assert "ix_tasks_updated_at_id" in [node.get("Index Name") for node in nodes]
+
+
+def test_reminder_scan_uses_due_date_index(db):
+    """Test the reminder scheduler's range scan is served by the due_date index"""
+    now = datetime.now(timezone.utc)
+    query = build_due_scan((now, MAX_ID), now, 10000)
+
+    nodes = list(_plan_nodes(_explain(db, query)))
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+    assert "ix_tasks_due_date" in [node.get("Index Name") for node in nodes]
+
+
+def test_reminder_catch_up_uses_an_index(db):
+    """Test the reminder catch-up pass never scans the whole table"""
+    now = datetime.now(timezone.utc)
+    query = build_catch_up_scan((now, MIN_ID), now, now, 10000)
+
+    nodes = list(_plan_nodes(_explain(db, query)))
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in nodes)
+    assert {"ix_tasks_updated_at_id", "ix_tasks_due_date"} & {node.get("Index Name") for node in nodes}
+
+
+def test_migrations_match_models(db):
+    """Test applying every migration to an empty schema yields the models' tables, columns and indexes"""
+    db.execute(text("CREATE SCHEMA migration_check"))
+    db.execute(text("SET LOCAL search_path TO migration_check"))
+
+    applied = apply_migrations(db.connection())
+
+    rows = db.execute(text(
+        "SELECT tablename, indexname FROM pg_indexes WHERE schemaname = 'migration_check'"
+    )).all()
+    migrated = {(table, index) for table, index in rows if not index.endswith("_pkey")}
+    modelled = {
+        (table.name, index.name)
+        for table in models.Base.metadata.sorted_tables
+        for index in table.indexes
+    }
+    tables = {
+        row[0] for row in db.execute(text(
+            "SELECT tablename FROM pg_tables WHERE schemaname = 'migration_check'"
+        ))
+    }
+
+    columns = set(db.execute(text(
+        "SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = 'migration_check'"
+    )).all())
+
+    assert applied == sorted(applied) and applied
+    assert tables - {"schema_migrations"} == set(models.Base.metadata.tables)
+    assert {(table, column) for table, column in columns if table != "schema_migrations"} == {
+        (table.name, column.name)
+        for table in models.Base.metadata.sorted_tables
+        for column in table.columns
+    }
+    assert migrated == modelled
@@ -0,0 +1,113 @@
+"""
+Tests for the transactional outbox and its relay
+"""
+
+from concurrent.futures import Future
+
+from sqlalchemy import select
+
+import models
+from outbox import OutboxRelay, add_outbox_message
+
+
+class FakePublisher:
+    """Collects published messages; confirms them only when told to"""
+
+    def __init__(self, auto_confirm: bool = True):
+        self.auto_confirm = auto_confirm
+        self.published = []
+
+    def publish(self, message: dict) -> Future:
+        future = Future()
+        if self.auto_confirm:
+            future.set_result(None)
+        self.published.append((message, future))
+        return future
+
+
+def _relay(publisher) -> OutboxRelay:
+    return OutboxRelay(
+        session_factory=None,
+        publisher=publisher,
+        batch_size=10,
+        poll_interval=1,
+        confirm_timeout=0.01,
+        lease=60
+    )
+
+
+def test_create_task_writes_outbox(client, db):
+    """Test creating a task stages its notification in the outbox"""
+    response = client.post("/tasks", json={"title": "Outbox Task"}, headers={"X-User-Email": "test@example.com"})
+
+    assert response.status_code == 201
+    messages = db.scalars(select(models.OutboxMessage)).all()
+    assert len(messages) == 1
+    assert messages[0].notification_type == "task_created"
+    assert messages[0].payload == {
+        "task_id": response.json()["id"],
+        "task_title": "Outbox Task",
+        "user_email": "test@example.com"
+    }
+
+
+def test_create_task_without_email_writes_nothing(client, db):
+    """Test a rejected create leaves neither a task nor an outbox row"""
+    response = client.post("/tasks", json={"title": "No Email"})
+
+    assert response.status_code == 401
+    assert db.scalars(select(models.Task)).all() == []
+    assert db.scalars(select(models.OutboxMessage)).all() == []
+
+
+def test_relay_publishes_and_deletes_confirmed(db):
+    """Test the relay publishes a batch in order and deletes confirmed rows"""
+    for i in range(3):
+        add_outbox_message(db, "task_created", {"task_title": f"Task {i}"})
+    db.commit()
+    publisher = FakePublisher()
+
+    delivered = _relay(publisher).relay_once(db)
+
+    assert delivered == 3
+    assert [message["task_title"] for message, _ in publisher.published] == ["Task 0", "Task 1", "Task 2"]
+    assert all(message["type"] == "task_created" for message, _ in publisher.published)
+    assert db.scalars(select(models.OutboxMessage)).all() == []
+
+
+def test_relay_keeps_unconfirmed_without_resending(db):
+    """Test unconfirmed rows stay in the outbox and are not published twice"""
+    add_outbox_message(db, "task_created", {"task_title": "Slow Broker"})
+    db.commit()
+    publisher = FakePublisher(auto_confirm=False)
+    relay = _relay(publisher)
+
+    assert relay.relay_once(db) == 0
+    assert relay.relay_once(db) == 0
+    assert len(publisher.published) == 1
+    assert len(db.scalars(select(models.OutboxMessage)).all()) == 1
+
+    # Broker confirms late: the next pass deletes the row
+    publisher.published[0][1].set_result(None)
+
+    assert relay.relay_once(db) == 1
+    assert db.scalars(select(models.OutboxMessage)).all() == []
+
+
+def test_relay_leases_rows_instead_of_locking_them(db):
+    """Test a batch awaiting confirms holds no transaction, other relays skip it and failed publishes are retried"""
+    add_outbox_message(db, "task_created", {"task_title": "Leased"})
+    db.commit()
+    publisher, other_publisher = FakePublisher(auto_confirm=False), FakePublisher()
+    relay, other_relay = _relay(publisher), _relay(other_publisher)
+
+    assert relay.relay_once(db) == 0
+    assert not db.in_transaction()
+    assert other_relay.relay_once(db) == 0
+    assert other_publisher.published == []
+
+    # The broker rejects it: the row is released and published again
+    publisher.published[0][1].set_exception(ConnectionError("nack"))
+
+    assert relay.relay_once(db) == 0
+    assert len(publisher.published) == 2
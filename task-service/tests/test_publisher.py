@@ -0,0 +1,114 @@
+"""
+Tests for the long-lived notification publisher
+Drives the publisher thread's callbacks directly, no broker needed.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pika
+import pytest
+
+from publisher import NotificationPublisher, PublisherQueueFull
+
+
+class FakeChannel:
+    """Records basic_publish calls"""
+
+    def __init__(self):
+        self.published = []
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        self.published.append(json.loads(body))
+
+
+@pytest.fixture
+def publisher():
+    """Publisher with an open (fake) confirm channel"""
+    publisher = NotificationPublisher(
+        queue_name="notifications",
+        max_queue_size=10,
+        batch_size=3,
+        max_in_flight=5,
+        reconnect_delay=0
+    )
+    publisher._channel = FakeChannel()
+    publisher._ready = True
+    return publisher
+
+
+def _confirm(publisher, method):
+    publisher._on_delivery_confirmation(SimpleNamespace(method=method))
+
+
+def test_publish_only_enqueues():
+    """Test publish returns immediately without a connection"""
+    publisher = NotificationPublisher("notifications", 10, 3, 5, 0)
+
+    future = publisher.publish({"type": "task_created"})
+
+    assert not future.done()
+    assert publisher.pending() == 1
+
+
+def test_publish_queue_full():
+    """Test publishing past the queue bound raises"""
+    publisher = NotificationPublisher("notifications", 1, 3, 5, 0)
+    publisher.publish({"type": "task_created"})
+
+    with pytest.raises(PublisherQueueFull):
+        publisher.publish({"type": "task_created"})
+
+
+def test_drain_publishes_in_batches(publisher):
+    """Test one drain publishes at most batch_size messages"""
+    for i in range(5):
+        publisher.publish({"type": "task_created", "n": i})
+
+    publisher._drain()
+
+    assert [message["n"] for message in publisher._channel.published] == [0, 1, 2]
+    assert len(publisher._outstanding) == 3
+
+
+def test_multiple_ack_resolves_batch(publisher):
+    """Test a single Ack with multiple=True confirms every earlier delivery tag"""
+    futures = [publisher.publish({"type": "task_created", "n": i}) for i in range(3)]
+    publisher._drain()
+
+    _confirm(publisher, pika.spec.Basic.Ack(delivery_tag=2, multiple=True))
+
+    assert futures[0].done() and futures[1].done()
+    assert not futures[2].done()
+
+    _confirm(publisher, pika.spec.Basic.Ack(delivery_tag=3, multiple=False))
+
+    assert futures[2].done()
+    assert publisher.pending() == 0
+
+
+def test_nack_is_retried(publisher):
+    """Test a nacked message is published again"""
+    future = publisher.publish({"type": "task_created", "n": 0})
+    publisher._drain()
+
+    _confirm(publisher, pika.spec.Basic.Nack(delivery_tag=1, multiple=False))
+
+    assert not future.done()
+    assert [message["n"] for message in publisher._channel.published] == [0, 0]
+
+
+def test_connection_loss_resends_unconfirmed_in_order(publisher):
+    """Test unconfirmed messages are re-sent first, in order, after reconnect"""
+    for i in range(4):
+        publisher.publish({"type": "task_created", "n": i})
+    publisher._drain()
+    _confirm(publisher, pika.spec.Basic.Ack(delivery_tag=1, multiple=False))
+
+    publisher._reset_channel()
+    publisher._channel = FakeChannel()
+    publisher._ready = True
+    publisher._delivery_tag = 0
+    publisher._drain()
+
+    assert [message["n"] for message in publisher._channel.published] == [1, 2, 3]
@@ -0,0 +1,59 @@
+"""
+Query budgets per endpoint, from the Server-Timing header of query_stats.py
+Budgets hold regardless of how many rows are involved, so an N+1 fails here.
+"""
+
+from metrics import render_metrics
+from tests.conftest import assert_query_budget
+
+
+def _task_with_comments(client, auth_headers, comments: int) -> str:
+    task_id = client.post("/tasks", json={"title": "Budget"}, headers=auth_headers).json()["id"]
+    for i in range(comments):
+        client.post(f"/tasks/{task_id}/comments", json={"content": f"Comment {i}"}, headers=auth_headers)
+    return task_id
+
+
+def test_read_endpoints_stay_within_budget(client, auth_headers):
+    """Test reads run a fixed number of statements however many tasks and comments there are"""
+    task_id = _task_with_comments(client, auth_headers, comments=10)
+    for i in range(10):
+        client.post("/tasks", json={"title": f"Other {i}"}, headers=auth_headers)
+
+    budgets = {
+        "/tasks": 1,
+        f"/tasks/{task_id}": 1,
+        f"/tasks/{task_id}/comments": 2,
+        "/tasks/stats": 1,
+        "/tasks/search?q=budget": 1,
+        "/tasks/changes": 3,
+    }
+    for url, budget in budgets.items():
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert_query_budget(response, budget)
+
+
+def test_write_endpoints_stay_within_budget(client, auth_headers):
+    """Test writes, including batches, run a fixed number of statements"""
+    created = client.post("/tasks", json={"title": "Write"}, headers=auth_headers)
+    task_id = created.json()["id"]
+    assert_query_budget(created, 3)
+
+    assert_query_budget(client.put(f"/tasks/{task_id}", json={"status": "DONE"}, headers=auth_headers), 2)
+    assert_query_budget(client.post(f"/tasks/{task_id}/comments", json={"content": "Hi"}, headers=auth_headers), 3)
+
+    batch = {"items": [{"title": f"Batch {i}"} for i in range(50)]}
+    assert_query_budget(client.post("/tasks:batch", json=batch, headers=auth_headers), 3)
+    assert_query_budget(client.delete(f"/tasks/{task_id}", headers=auth_headers), 3)
+
+
+def test_statements_reach_metrics(client, auth_headers):
+    """Test statement counts and time are exported on /metrics"""
+    client.get("/tasks", headers=auth_headers)
+
+    metrics = render_metrics()
+
+    assert "db_statements_total" in metrics
+    assert "db_statement_seconds_total" in metrics
+    assert "http_requests_total" in metrics
@@ -0,0 +1,154 @@
+"""
+Tests for the due-date reminder scheduler
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+import main
+import models
+from reminders import KINDS, ReminderScheduler
+from database import SessionLocal
+
+
+def _scheduler(max_timers: int = 100) -> ReminderScheduler:
+    return ReminderScheduler(SessionLocal, KINDS, window=3600, max_timers=max_timers, scan_interval=60)
+
+
+def _task(client, auth_headers, title: str, due_date: datetime, **fields) -> str:
+    task = {"title": title, "due_date": due_date.isoformat(), **fields}
+    return client.post("/tasks", json=task, headers=auth_headers).json()["id"]
+
+
+def _outbox(db, notification_type: str) -> list[dict]:
+    return db.scalars(
+        select(models.OutboxMessage.payload)
+        .where(models.OutboxMessage.notification_type == notification_type)
+        .order_by(models.OutboxMessage.id)
+    ).all()
+
+
+def test_scan_loads_the_window_once(client, auth_headers, db):
+    """Test scans load only open tasks due within the window, never the same task twice"""
+    now = datetime.now(timezone.utc)
+    _task(client, auth_headers, "Soon", now + timedelta(minutes=10))
+    _task(client, auth_headers, "Later", now + timedelta(minutes=30))
+    _task(client, auth_headers, "Next week", now + timedelta(days=7))
+    _task(client, auth_headers, "Finished", now + timedelta(minutes=10), status="DONE")
+
+    scheduler = _scheduler()
+    scheduler.load_watermarks(db, now)
+
+    # due soon and overdue timers for Soon and Later
+    assert scheduler.scan(db, now) == 4
+    assert scheduler.scan(db, now) == 0
+
+    bounded = _scheduler(max_timers=1)
+    bounded.load_watermarks(db, now)
+    assert bounded.scan(db, now) == 1
+    assert bounded.timer_count == 1
+
+
+def test_reminders_fire_once_and_skip_finished_tasks(client, auth_headers, db):
+    """Test due timers stage notifications once across replicas and skip tasks completed since loading"""
+    now = datetime.now(timezone.utc)
+    soon = _task(client, auth_headers, "Soon", now + timedelta(minutes=10))
+    finished = _task(client, auth_headers, "Finished later", now + timedelta(minutes=20))
+
+    scheduler, replica = _scheduler(), _scheduler()
+    for instance in (scheduler, replica):
+        instance.load_watermarks(db, now)
+        instance.scan(db, now)
+
+    assert scheduler.fire_due(db, now) == 2
+    assert replica.fire_due(db, now) == 0
+    due_soon = _outbox(db, "task_due_soon")
+    assert [payload["task_id"] for payload in due_soon] == [soon, finished]
+    assert due_soon[0]["user_email"] == "test@example.com"
+
+    client.put(f"/tasks/{finished}", json={"status": "DONE"}, headers=auth_headers)
+
+    assert scheduler.fire_due(db, now + timedelta(minutes=30)) == 1
+    assert [payload["task_id"] for payload in _outbox(db, "task_overdue")] == [soon]
+    assert scheduler.timer_count == 0
+
+
+def test_endpoints_schedule_tasks_in_the_loaded_window(client, auth_headers, db, monkeypatch):
+    """Test tasks created into the loaded window get timers, and rescheduled ones drop their old reminder"""
+    now = datetime.now(timezone.utc)
+    scheduler = _scheduler()
+    scheduler.load_watermarks(db, now)
+    scheduler.scan(db, now)
+    monkeypatch.setattr(main, "reminder_scheduler", scheduler)
+
+    task_id = _task(client, auth_headers, "New", now + timedelta(minutes=5))
+    assert scheduler.timer_count == 2
+
+    client.put(
+        f"/tasks/{task_id}",
+        json={"due_date": (now + timedelta(days=3)).isoformat()},
+        headers=auth_headers
+    )
+
+    assert scheduler.fire_due(db, now + timedelta(minutes=10)) == 0
+
+
+def test_tasks_due_before_a_fired_reminder_still_fire(client, auth_headers, db, monkeypatch):
+    """Test a task created due sooner than an already reminded one gets its reminder"""
+    now = datetime.now(timezone.utc)
+    scheduler = _scheduler()
+    scheduler.load_watermarks(db, now)
+    scheduler.scan(db, now)
+    monkeypatch.setattr(main, "reminder_scheduler", scheduler)
+
+    far = _task(client, auth_headers, "Far", now + timedelta(hours=20))
+    assert scheduler.fire_due(db, now) == 1
+
+    near = _task(client, auth_headers, "Near", now + timedelta(hours=2))
+    assert scheduler.fire_due(db, now) == 1
+
+    assert [payload["task_id"] for payload in _outbox(db, "task_due_soon")] == [far, near]
+    # The scans still resume after the furthest reminder fired
+    watermark = db.get(models.ReminderWatermark, "task_due_soon")
+    assert str(watermark.task_id) == far
+
+
+def test_scans_catch_up_with_tasks_written_elsewhere(client, auth_headers, db):
+    """Test tasks written by another replica or the importer behind the scan positions get their reminder"""
+    now = datetime.now(timezone.utc)
+    # This scheduler isn't the one the endpoints schedule on: it only learns of tasks by scanning
+    scheduler = _scheduler()
+    scheduler.load_watermarks(db, now)
+    scheduler.scan(db, now)
+
+    far = _task(client, auth_headers, "Far", now + timedelta(hours=20))
+    scheduler.scan(db, now)
+    assert scheduler.fire_due(db, now) == 1
+
+    near = _task(client, auth_headers, "Near", now + timedelta(hours=2))
+    scheduler.scan(db, now + timedelta(minutes=1))
+    assert scheduler.fire_due(db, now + timedelta(minutes=1)) == 1
+
+    assert [payload["task_id"] for payload in _outbox(db, "task_due_soon")] == [far, near]
+
+
+def test_schedule_respects_the_heap_bound(client, auth_headers, db, monkeypatch):
+    """Test endpoint scheduling never grows the heap past max_timers, and scans load the rest later"""
+    now = datetime.now(timezone.utc)
+    scheduler = _scheduler(max_timers=2)
+    scheduler.load_watermarks(db, now)
+    scheduler.scan(db, now)
+    monkeypatch.setattr(main, "reminder_scheduler", scheduler)
+
+    first = _task(client, auth_headers, "First", now + timedelta(minutes=5))
+    second = _task(client, auth_headers, "Second", now + timedelta(minutes=20))
+    assert scheduler.timer_count == 2
+
+    assert scheduler.fire_due(db, now + timedelta(minutes=10)) == 2
+    scheduler.scan(db, now + timedelta(minutes=10))
+    assert scheduler.timer_count == 2
+    assert scheduler.fire_due(db, now + timedelta(minutes=30)) == 2
+
+    assert [payload["task_id"] for payload in _outbox(db, "task_due_soon")] == [first, second]
+    assert [payload["task_id"] for payload in _outbox(db, "task_overdue")] == [first, second]
@@ -0,0 +1,131 @@
+"""
+Tests for read-replica routing and read-your-writes pinning
+"""
+
+import asyncio
+import time
+
+from fastapi import Request
+from jose import jwt
+from redis.exceptions import ConnectionError
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import get_db, get_read_db
+from read_your_writes import ReadYourWrites, request_user_id
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis pins use, with expiring keys"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def set(self, key, value, px=None):
+        self.store[key] = (value, time.monotonic() + px / 1000)
+
+    async def exists(self, key):
+        entry = self.store.get(key)
+        return int(entry is not None and entry[1] > time.monotonic())
+
+
+class BrokenRedis:
+    async def set(self, key, value, px=None):
+        raise ConnectionError("down")
+
+    async def exists(self, key):
+        raise ConnectionError("down")
+
+
+def _request(user_id: str = None, token: str = None) -> Request:
+    headers = []
+    if user_id:
+        headers.append((b"x-user-id", user_id.encode()))
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+def _role(dependency, request: Request) -> str:
+    """Run a session dependency as a successful request would and report its pool"""
+    async def run():
+        sessions = dependency(request)
+        db = await sessions.__anext__()
+        async for _ in sessions:
+            pass
+        return db.sync_session.info["role"]
+
+    return asyncio.run(run())
+
+
+def test_request_user_id():
+    """Test the gateway's user id wins over the token subject, and bad tokens give no user"""
+    token = jwt.encode({"sub": "from-token"}, "any-key", algorithm="HS256")
+
+    assert request_user_id(_request("from-gateway", token)) == "from-gateway"
+    assert request_user_id(_request(token=token)) == "from-token"
+    assert request_user_id(_request(token="not-a-jwt")) is None
+    assert request_user_id(_request()) is None
+
+
+def test_pins_expire_per_user():
+    """Test a pin covers only the writing user and only for the window"""
+    pins = ReadYourWrites(window=0.05)
+
+    async def run():
+        await pins.pin("writer")
+        await pins.pin(None)
+
+        assert await pins.is_pinned("writer")
+        assert not await pins.is_pinned("reader")
+        assert not await pins.is_pinned(None)
+        time.sleep(0.06)
+        assert not await pins.is_pinned("writer")
+
+    asyncio.run(run())
+
+
+def test_pins_are_shared_through_redis():
+    """Test a pin set by one instance routes the user's reads on another"""
+    store = FakeRedis()
+    writer_instance, reader_instance = ReadYourWrites(window=60), ReadYourWrites(window=60)
+    writer_instance.client = reader_instance.client = store
+
+    async def run():
+        await writer_instance.pin("writer")
+
+        assert await reader_instance.is_pinned("writer")
+        assert not await reader_instance.is_pinned("reader")
+
+    asyncio.run(run())
+
+
+def test_redis_errors_read_the_primary():
+    """Test a failing Redis keeps pins in process and sends unknown users to the primary"""
+    pins = ReadYourWrites(window=60)
+    pins.client = BrokenRedis()
+
+    async def run():
+        await pins.pin("writer")
+
+        assert "writer" in pins._local
+        assert await pins.is_pinned("reader")
+
+    asyncio.run(run())
+
+
+def test_reads_use_replica_until_user_writes(monkeypatch):
+    """Test get_read_db picks the replica, and the primary right after the user's get_db request"""
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(info={"role": "primary"}))
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(info={"role": "replica"}))
+    monkeypatch.setattr(database, "read_your_writes", ReadYourWrites(window=60))
+    writer_token = jwt.encode({"sub": "writer"}, "any-key", algorithm="HS256")
+
+    assert _role(get_read_db, _request("writer")) == "replica"
+
+    assert _role(get_db, _request("writer")) == "primary"
+
+    assert _role(get_read_db, _request("writer")) == "primary"
+    # A new token for the same user is still pinned
+    assert _role(get_read_db, _request(token=writer_token)) == "primary"
+    assert _role(get_read_db, _request("reader")) == "replica"
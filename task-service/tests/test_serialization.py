@@ -0,0 +1,70 @@
+"""
+Tests and benchmark for the fast JSON path (FAST_JSON_RESPONSES)
+"""
+
+import json
+import logging
+import time
+
+import pytest
+from sqlalchemy import select
+
+import models
+import schemas
+from config import get_settings
+from importer import copy_tasks
+from projection import TASK_FIELDS
+from serialization import encode_json, row_dicts
+from tests.conftest import TEST_USER_ID
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+BENCHMARK_ROWS = 10_000
+
+
+@pytest.fixture
+def fast_json(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+
+
+def test_fast_path_matches_models(client, auth_headers, monkeypatch):
+    """Test list pages are identical with and without the fast path"""
+    task_id = client.post("/tasks", json={"title": "Same", "description": "Details"}, headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{task_id}/comments", json={"content": "Same comment"}, headers=auth_headers)
+    urls = ["/tasks", f"/tasks/{task_id}/comments"]
+
+    slow = [client.get(url, headers=auth_headers) for url in urls]
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = [client.get(url, headers=auth_headers) for url in urls]
+
+    for before, after in zip(slow, fast):
+        assert after.content == before.content
+        assert after.headers["ETag"] == before.headers["ETag"]
+
+
+@pytest.mark.benchmark
+def test_fast_path_benchmark(db):
+    """Benchmark rows/sec of a 10k-task list: ORM + pydantic vs row tuples + orjson"""
+    copy_tasks(db, [schemas.TaskCreate(title=f"Bench {i}", description="x" * 200) for i in range(BENCHMARK_ROWS)], TEST_USER_ID)
+    db.commit()
+
+    def models_path() -> bytes:
+        tasks = db.scalars(select(models.Task)).all()
+        page = schemas.TaskPage(items=[schemas.TaskResponse.model_validate(task) for task in tasks])
+        db.expunge_all()
+        return page.model_dump_json().encode()
+
+    def fast_path() -> bytes:
+        rows = db.execute(select(*[getattr(models.Task, name) for name in TASK_FIELDS])).all()
+        return encode_json({"items": row_dicts(rows, TASK_FIELDS), "next_cursor": None})
+
+    results = {}
+    for name, path in [("models", models_path), ("fast", fast_path)]:
+        path()  # warm up
+        started = time.perf_counter()
+        body = path()
+        results[name] = (BENCHMARK_ROWS / (time.perf_counter() - started), body)
+
+    logger.info(f"{BENCHMARK_ROWS} tasks: models {results['models'][0]:,.0f} rows/s, fast {results['fast'][0]:,.0f} rows/s")
+    assert json.loads(results["fast"][1]) == json.loads(results["models"][1])
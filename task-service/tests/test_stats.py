@@ -0,0 +1,80 @@
+"""
+Tests for the maintained task counters and GET /tasks/stats
+"""
+
+import uuid
+
+from sqlalchemy import text, update
+
+import models
+from stats import RECONCILE_LOCK_KEY, reconcile_stats
+from tests.conftest import engine
+
+
+def _stats(client, auth_headers) -> dict:
+    response = client.get("/tasks/stats", headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_stats_follow_writes(client, auth_headers):
+    """Test create, update and delete keep every breakdown in step"""
+    assignee = str(uuid.uuid4())
+    first = client.post("/tasks", json={"title": "One", "priority": "HIGH"}, headers=auth_headers).json()["id"]
+    second = client.post("/tasks", json={"title": "Two", "assigned_to": assignee}, headers=auth_headers).json()["id"]
+
+    client.put(f"/tasks/{first}", json={"status": "DONE", "assigned_to": assignee}, headers=auth_headers)
+    client.delete(f"/tasks/{second}", headers=auth_headers)
+
+    assert _stats(client, auth_headers) == {
+        "total": 1,
+        "by_status": {"DONE": 1},
+        "by_priority": {"HIGH": 1},
+        "by_assignee": [{"assigned_to": assignee, "count": 1}],
+    }
+
+
+def test_stats_follow_batch_writes(client, auth_headers):
+    """Test the batch endpoints apply the same deltas"""
+    created = client.post("/tasks:batch", json={"items": [
+        {"title": "A"}, {"title": "B"}, {"title": "C", "status": "IN_PROGRESS"},
+    ]}, headers=auth_headers).json()["results"]
+    ids = [result["id"] for result in created]
+
+    client.patch("/tasks:batch", json={"items": [
+        {"id": ids[0], "status": "DONE"}, {"id": str(uuid.uuid4()), "status": "DONE"},
+    ]}, headers=auth_headers)
+    client.request("DELETE", "/tasks:batch", json={"ids": [ids[1]]}, headers=auth_headers)
+
+    stats = _stats(client, auth_headers)
+    assert stats["total"] == 2
+    assert stats["by_status"] == {"DONE": 1, "IN_PROGRESS": 1}
+    assert stats["by_assignee"] == [{"assigned_to": None, "count": 2}]
+
+
+def test_reconcile_corrects_drift(client, auth_headers, db):
+    """Test the reconciler recounts counters changed behind its back"""
+    task_id = client.post("/tasks", json={"title": "Drift"}, headers=auth_headers).json()["id"]
+    db.execute(update(models.Task).where(models.Task.id == uuid.UUID(task_id)).values(status="DONE"))
+    db.execute(update(models.TaskStat).where(models.TaskStat.dimension == "priority").values(count=42))
+    db.commit()
+
+    assert reconcile_stats(db) == 3
+    assert reconcile_stats(db) == 0
+    assert _stats(client, auth_headers)["by_status"] == {"DONE": 1}
+    assert _stats(client, auth_headers)["by_priority"] == {"MEDIUM": 1}
+
+
+def test_reconcile_runs_on_one_instance_at_a_time(client, auth_headers, db):
+    """Test a pass is skipped while another instance holds the reconcile lock"""
+    task_id = client.post("/tasks", json={"title": "Drift"}, headers=auth_headers).json()["id"]
+    db.execute(update(models.Task).where(models.Task.id == uuid.UUID(task_id)).values(status="DONE"))
+
+    with engine.connect() as other:
+        other.execute(text("SELECT pg_advisory_lock(:key)"), {"key": RECONCILE_LOCK_KEY})
+        try:
+            assert reconcile_stats(db) == 0
+        finally:
+            other.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": RECONCILE_LOCK_KEY})
+
+    assert reconcile_stats(db) == 2
@@ -2,21 +2,21 @@
 Tests for Task Service endpoints
 """
 
-import pytest
+import csv
+import io
+import json
 import uuid
 from faker import Faker
+from sqlalchemy import event, select
 
-fake = Faker()
+import models
+import schemas
+from config import get_settings
+from tests.conftest import engine
 
+settings = get_settings()
 
-# Helper fixture for authenticated headers
-@pytest.fixture
-def auth_headers():
-    """Mock authenticated user headers"""
-    return {
-        "X-User-ID": str(uuid.uuid4()),
-        "X-User-Email": "test@example.com"
-    }
+fake = Faker()
 
 
 # ==================== Health Check ====================
@@ -90,7 +90,7 @@ def test_list_tasks(client, auth_headers):
     
     assert response.status_code == 200
     data = response.json()
-    assert len(data) >= 2
+    assert len(data["items"]) >= 2
 
 
 def test_list_tasks_filter_by_status(client, auth_headers):
@@ -103,7 +103,7 @@ def test_list_tasks_filter_by_status(client, auth_headers):
     
     assert response.status_code == 200
     data = response.json()
-    for task in data:
+    for task in data["items"]:
         assert task["status"] == "TODO"
 
 
@@ -116,10 +116,181 @@ def test_list_tasks_filter_by_priority(client, auth_headers):
     
     assert response.status_code == 200
     data = response.json()
-    for task in data:
+    for task in data["items"]:
         assert task["priority"] == "HIGH"
 
 
+def test_list_tasks_filter_by_due_before(client, auth_headers):
+    """Test filtering tasks due on or before a date"""
+    client.post("/tasks", json={"title": "Due Soon", "due_date": "2030-01-01T00:00:00Z"}, headers=auth_headers)
+    client.post("/tasks", json={"title": "Due Later", "due_date": "2031-01-01T00:00:00Z"}, headers=auth_headers)
+
+    response = client.get("/tasks", params={"due_before": "2030-06-01T00:00:00Z"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    titles = [task["title"] for task in response.json()["items"]]
+    assert "Due Soon" in titles
+    assert "Due Later" not in titles
+
+
+def test_list_tasks_pagination(client, auth_headers):
+    """Test walking all tasks page by page with the cursor"""
+    created_ids = [
+        client.post("/tasks", json={"title": f"Page Task {i}"}, headers=auth_headers).json()["id"]
+        for i in range(5)
+    ]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/tasks", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 2
+        seen.extend(task["id"] for task in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    # Newest first, no duplicates, nothing skipped
+    assert len(seen) == len(set(seen))
+    assert seen[:5] == list(reversed(created_ids))
+
+
+def test_list_tasks_limit_too_large(client, auth_headers):
+    """Test limit above the configured maximum is rejected"""
+    response = client.get("/tasks?limit=100000", headers=auth_headers)
+
+    assert response.status_code == 422
+
+
+def test_list_tasks_invalid_cursor(client, auth_headers):
+    """Test malformed cursor returns 400"""
+    response = client.get("/tasks?cursor=not-a-cursor", headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+# ==================== Field Projection ====================
+
+def test_list_tasks_fields(client, auth_headers):
+    """Test ?fields= returns only the requested fields, still paginated"""
+    for i in range(3):
+        client.post("/tasks", json={"title": f"Sparse {i}", "description": "long text"}, headers=auth_headers)
+
+    response = client.get("/tasks?fields=id,title,status&limit=2", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [set(task) for task in data["items"]] == [{"id", "title", "status"}] * 2
+    assert [task["title"] for task in data["items"]] == ["Sparse 2", "Sparse 1"]
+
+    next_page = client.get("/tasks", params={"fields": "title", "cursor": data["next_cursor"]}, headers=auth_headers).json()
+    assert next_page["items"] == [{"title": "Sparse 0"}]
+
+
+def test_get_task_fields(client, auth_headers):
+    """Test a projected task matches the full representation's values"""
+    task_id = client.post("/tasks", json={"title": "Projected"}, headers=auth_headers).json()["id"]
+    full = client.get(f"/tasks/{task_id}", headers=auth_headers)
+
+    response = client.get(f"/tasks/{task_id}?fields=title,created_at,id", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == {key: full.json()[key] for key in ("title", "created_at", "id")}
+    assert response.headers["ETag"] != full.headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": response.headers["ETag"]}
+    assert client.get(f"/tasks/{task_id}?fields=title,created_at,id", headers=conditional).status_code == 304
+
+
+def test_fields_unknown(client, auth_headers):
+    """Test unknown field names are rejected"""
+    response = client.get("/tasks?fields=id,secret", headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+# ==================== Export ====================
+
+def test_export_tasks_ndjson(client, auth_headers, monkeypatch):
+    """Test NDJSON export streams every matching task across cursor batches"""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    for i in range(5):
+        client.post("/tasks", json={"title": f"Export {i}", "priority": "HIGH" if i % 2 else "LOW"}, headers=auth_headers)
+
+    response = client.get("/tasks/export?priority=HIGH", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Export 3", "Export 1"]
+    assert set(rows[0]) == set(schemas.TaskResponse.model_fields)
+
+
+def test_export_tasks_csv(client, auth_headers):
+    """Test CSV export has a header and one row per task"""
+    client.post("/tasks", json={"title": "Comma, inside", "description": "Line\nbreak"}, headers=auth_headers)
+
+    response = client.get("/tasks/export?format=csv", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "Comma, inside"
+    assert rows[0]["description"] == "Line\nbreak"
+    assert rows[0]["assigned_to"] == ""
+
+
+def test_export_tasks_invalid_format(client, auth_headers):
+    """Test an unknown export format is rejected"""
+    response = client.get("/tasks/export?format=xml", headers=auth_headers)
+
+    assert response.status_code == 422
+
+
+# ==================== Search ====================
+
+def test_search_tasks(client, auth_headers):
+    """Test search matches title and description, title hits ranked first"""
+    client.post("/tasks", json={"title": "Fix login page"}, headers=auth_headers)
+    client.post("/tasks", json={"title": "Refactor", "description": "The login flow is slow"}, headers=auth_headers)
+    client.post("/tasks", json={"title": "Unrelated"}, headers=auth_headers)
+
+    response = client.get("/tasks/search?q=logins", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()["items"]] == ["Fix login page", "Refactor"]
+
+
+def test_search_tasks_pagination(client, auth_headers):
+    """Test walking equally ranked search results with the cursor"""
+    for i in range(5):
+        client.post("/tasks", json={"title": f"Deploy service {i}"}, headers=auth_headers)
+
+    seen = []
+    cursor = None
+    for _ in range(5):
+        params = {"q": "deploy", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        data = client.get("/tasks/search", params=params, headers=auth_headers).json()
+        seen += [task["title"] for task in data["items"]]
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [f"Deploy service {i}" for i in reversed(range(5))]
+
+
+def test_search_tasks_requires_query(client, auth_headers):
+    """Test an empty query is rejected"""
+    response = client.get("/tasks/search?q=", headers=auth_headers)
+
+    assert response.status_code == 422
+
+
 # ==================== Get Single Task ====================
 
 def test_get_task(client, auth_headers):
@@ -188,6 +359,16 @@ def test_update_task_partial(client, auth_headers):
     assert data["description"] == "Original Description"  # Unchanged
 
 
+def test_update_task_empty(client, auth_headers):
+    """Test an update without fields changes nothing, not even updated_at"""
+    created = client.post("/tasks", json={"title": "Untouched"}, headers=auth_headers).json()
+
+    response = client.put(f"/tasks/{created['id']}", json={}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == created
+
+
 def test_update_task_not_found(client, auth_headers):
     """Test updating non-existent task returns 404"""
     fake_id = str(uuid.uuid4())
@@ -215,6 +396,26 @@ def test_delete_task(client, auth_headers):
     assert get_response.status_code == 404
 
 
+def test_delete_task_cascades_in_database(client, auth_headers, db):
+    """Test deleting a task with comments is one DELETE and Postgres removes the comments"""
+    task_id = client.post("/tasks", json={"title": "Busy Task"}, headers=auth_headers).json()["id"]
+    for i in range(3):
+        client.post(f"/tasks/{task_id}/comments", json={"content": f"Comment {i}"}, headers=auth_headers)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 204
+    assert not any("comments" in statement for statement in statements)
+    assert [statement.split()[0] for statement in statements if "tasks" in statement] == ["DELETE"]
+    assert db.scalars(select(models.Comment).where(models.Comment.task_id == uuid.UUID(task_id))).all() == []
+
+
 def test_delete_task_not_found(client, auth_headers):
     """Test deleting non-existent task returns 404"""
     fake_id = str(uuid.uuid4())
@@ -268,7 +469,39 @@ def test_list_comments(client, auth_headers):
     
     assert response.status_code == 200
     data = response.json()
-    assert len(data) == 2
+    assert len(data["items"]) == 2
+
+
+def test_list_comments_pagination(client, auth_headers):
+    """Test comments are paged oldest first with a cursor"""
+    task_id = client.post("/tasks", json={"title": "Busy Task"}, headers=auth_headers).json()["id"]
+    for i in range(5):
+        client.post(f"/tasks/{task_id}/comments", json={"content": f"Comment {i}"}, headers=auth_headers)
+
+    contents = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get(f"/tasks/{task_id}/comments", params=params, headers=auth_headers).json()
+        contents.extend(comment["content"] for comment in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert contents == [f"Comment {i}" for i in range(5)]
+
+
+def test_comment_count(client, auth_headers):
+    """Test comment_count on the task follows added comments"""
+    task_id = client.post("/tasks", json={"title": "Counted"}, headers=auth_headers).json()["id"]
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["comment_count"] == 0
+
+    client.post(f"/tasks/{task_id}/comments", json={"content": "One"}, headers=auth_headers)
+    client.post(f"/tasks/{task_id}/comments", json={"content": "Two"}, headers=auth_headers)
+
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["comment_count"] == 2
 
 
 def test_list_comments_task_not_found(client, auth_headers):
@@ -277,4 +510,128 @@ def test_list_comments_task_not_found(client, auth_headers):
     
     response = client.get(f"/tasks/{fake_id}/comments", headers=auth_headers)
     
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+# ==================== Batch ====================
+
+def test_create_tasks_batch(client, auth_headers):
+    """Test creating many tasks in one request"""
+    items = [{"title": f"Batch Task {i}", "priority": "HIGH"} for i in range(3)]
+
+    response = client.post("/tasks:batch", json={"items": items}, headers=auth_headers)
+
+    assert response.status_code == 201
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["created"] * 3
+    assert [result["task"]["title"] for result in results] == ["Batch Task 0", "Batch Task 1", "Batch Task 2"]
+
+    get_response = client.get(f"/tasks/{results[0]['id']}", headers=auth_headers)
+    assert get_response.status_code == 200
+
+
+def test_create_tasks_batch_too_large(client, auth_headers):
+    """Test batches above the configured maximum are rejected"""
+    items = [{"title": "Task"}] * 501
+
+    response = client.post("/tasks:batch", json={"items": items}, headers=auth_headers)
+
+    assert response.status_code == 422
+
+
+def test_update_tasks_batch(client, auth_headers):
+    """Test batch update changes only the fields each item sets"""
+    first = client.post("/tasks", json={"title": "First", "description": "Keep"}, headers=auth_headers).json()
+    second = client.post("/tasks", json={"title": "Second", "priority": "LOW"}, headers=auth_headers).json()
+    missing_id = str(uuid.uuid4())
+
+    response = client.patch("/tasks:batch", json={"items": [
+        {"id": first["id"], "status": "DONE"},
+        {"id": missing_id, "title": "Nope"},
+        {"id": second["id"], "title": "Second Renamed", "assigned_to": None},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["updated", "not_found", "updated"]
+    assert results[0]["task"]["status"] == "DONE"
+    assert results[0]["task"]["description"] == "Keep"
+    assert results[2]["task"]["title"] == "Second Renamed"
+    assert results[2]["task"]["priority"] == "LOW"
+
+
+def test_update_tasks_batch_duplicate_ids(client, auth_headers):
+    """Test a batch naming the same task twice is rejected"""
+    task_id = str(uuid.uuid4())
+
+    response = client.patch("/tasks:batch", json={"items": [
+        {"id": task_id, "title": "A"},
+        {"id": task_id, "title": "B"},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 422
+
+
+def test_delete_tasks_batch(client, auth_headers):
+    """Test deleting many tasks in one request"""
+    task_id = client.post("/tasks", json={"title": "Delete Me"}, headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{task_id}/comments", json={"content": "Goes too"}, headers=auth_headers)
+    missing_id = str(uuid.uuid4())
+
+    response = client.request("DELETE", "/tasks:batch", json={"ids": [task_id, missing_id]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"id": task_id, "status": "deleted", "task": None},
+        {"id": missing_id, "status": "not_found", "task": None},
+    ]
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 404
+
+
+# ==================== Conditional GETs ====================
+
+def test_get_task_etag(client, auth_headers):
+    """Test a matching If-None-Match gets 304 until the task changes"""
+    task_id = client.post("/tasks", json={"title": "Tagged"}, headers=auth_headers).json()["id"]
+
+    first = client.get(f"/tasks/{task_id}", headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert etag.startswith('"')
+
+    cached = client.get(f"/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    client.put(f"/tasks/{task_id}", json={"title": "Retagged"}, headers=auth_headers)
+
+    changed = client.get(f"/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["title"] == "Retagged"
+
+
+def test_list_tasks_etag(client, auth_headers):
+    """Test list pages revalidate until a task on them changes"""
+    task_id = client.post("/tasks", json={"title": "Listed"}, headers=auth_headers).json()["id"]
+
+    etag = client.get("/tasks", headers=auth_headers).headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": f'W/"stale", {etag}'}
+
+    assert client.get("/tasks", headers=conditional).status_code == 304
+
+    client.put(f"/tasks/{task_id}", json={"status": "DONE"}, headers=auth_headers)
+    assert client.get("/tasks", headers=conditional).status_code == 200
+
+
+def test_list_comments_etag(client, auth_headers):
+    """Test a new comment changes the comment list's ETag"""
+    task_id = client.post("/tasks", json={"title": "Discussed"}, headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{task_id}/comments", json={"content": "First"}, headers=auth_headers)
+
+    etag = client.get(f"/tasks/{task_id}/comments", headers=auth_headers).headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": etag}
+
+    assert client.get(f"/tasks/{task_id}/comments", headers=conditional).status_code == 304
+
+    client.post(f"/tasks/{task_id}/comments", json={"content": "Second"}, headers=auth_headers)
+    assert client.get(f"/tasks/{task_id}/comments", headers=conditional).status_code == 200
@@ -0,0 +1,99 @@
+"""
+Tests and benchmark for the verified-token cache
+"""
+
+import logging
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+import dependencies
+from config import get_settings
+from dependencies import get_current_user_id
+from token_cache import TokenCache
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+BENCHMARK_CALLS = 20_000
+
+
+def _token(user_id: uuid.UUID, expires_in: float = 900, token_type: str = "access") -> str:
+    claims = {"sub": str(user_id), "type": token_type, "exp": int(time.time() + expires_in)}
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def _credentials(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _authenticate(credentials: HTTPAuthorizationCredentials) -> uuid.UUID:
+    return get_current_user_id(Request({"type": "http", "headers": []}), credentials)
+
+
+def test_entries_expire_with_the_token():
+    """Test an entry is dropped at its exp (or ttl), and expired tokens are never stored"""
+    cache = TokenCache(max_size=10, ttl=60)
+    ttl_bound = TokenCache(max_size=10, ttl=0.05)
+
+    cache.put("short", "user", exp=time.time() + 0.05)
+    cache.put("expired", "user", exp=time.time() - 1)
+    ttl_bound.put("long", "user", exp=time.time() + 900)
+
+    assert cache.get("short") == "user"
+    assert cache.get("expired") is None
+    time.sleep(0.06)
+    assert cache.get("short") is None
+    assert ttl_bound.get("long") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_go_first():
+    """Test the cache stays within max_size by evicting the least recently used token"""
+    cache = TokenCache(max_size=2, ttl=60)
+    exp = time.time() + 60
+
+    cache.put("a", 1, exp)
+    cache.put("b", 2, exp)
+    cache.get("a")
+    cache.put("c", 3, exp)
+
+    assert [cache.get(token) for token in ("a", "b", "c")] == [1, None, 3]
+
+
+def test_cached_dependency_still_rejects_bad_tokens(monkeypatch):
+    """Test get_current_user_id answers valid tokens from the cache and keeps rejecting invalid ones"""
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache(max_size=10, ttl=60))
+    user_id = uuid.uuid4()
+    token = _token(user_id)
+
+    assert _authenticate(_credentials(token)) == user_id
+    assert _authenticate(_credentials(token)) == user_id
+    assert len(dependencies.token_cache) == 1
+
+    for bad in (token[:-2] + "xx", _token(user_id, expires_in=-10), _token(user_id, token_type="refresh")):
+        with pytest.raises(HTTPException) as error:
+            _authenticate(_credentials(bad))
+        assert error.value.status_code == 401
+    assert len(dependencies.token_cache) == 1
+
+
+@pytest.mark.benchmark
+def test_token_cache_benchmark(monkeypatch):
+    """Benchmark per-request token verification: jwt.decode every time vs the cache"""
+    credentials = _credentials(_token(uuid.uuid4()))
+    results = {}
+
+    for name, max_size in [("decode", 0), ("cached", settings.TOKEN_CACHE_SIZE)]:
+        monkeypatch.setattr(dependencies, "token_cache", TokenCache(max_size=max_size, ttl=60))
+        _authenticate(credentials)  # warm up
+        started = time.perf_counter()
+        for _ in range(BENCHMARK_CALLS):
+            _authenticate(credentials)
+        results[name] = (time.perf_counter() - started) / BENCHMARK_CALLS * 1e6
+
+    logger.info(f"get_current_user_id: decode {results['decode']:.1f} us/request, cached {results['cached']:.1f} us/request")